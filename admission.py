@@ -0,0 +1,162 @@
+"""Admission control for JWT-protected routes.
+
+Reads (``GET``/``HEAD``) and writes (everything else) each get a
+concurrency limit with a bounded wait queue, so a burst of writes
+stuck behind SQLite's single writer lock cannot take every request thread
+away from cheap reads. A request that finds its queue full, or is still
+queued after ``ADMISSION_QUEUE_TIMEOUT`` seconds, is shed with a 503; an
+identity that exceeds its token bucket gets a 429. Both carry
+``Retry-After``. Limits are per process, so under ``server.py`` they apply
+to each worker.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context, jsonify
+from typing import Any, Callable, Dict, Optional, Tuple
+import metrics
+
+SAFE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+class Rejected(Exception):
+    """The request was not admitted; ``response()`` is what to send instead."""
+
+    def __init__(self, status: int, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.retry_after = max(1, math.ceil(retry_after))
+
+    def response(self) -> Tuple[Any, int, Dict[str, str]]:
+        return jsonify({'message': self.message}), self.status, {'Retry-After': str(self.retry_after)}
+
+
+class Limiter:
+    """At most ``limit`` requests at once, at most ``queue_size`` waiting for ``timeout`` seconds."""
+
+    def __init__(self, name: str, limit: int, queue_size: int, timeout: float, retry_after: float,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._clock = clock
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+
+    def _shed(self, reason: str) -> Rejected:
+        metrics.ADMISSION_SHED.inc(route=self.name, reason=reason)
+        return Rejected(503, 'Server is overloaded; retry later.', self.retry_after)
+
+    def acquire(self) -> None:
+        with self._cond:
+            # Queued requests go first; a newcomer only skips the queue when it is empty
+            if self.active < self.limit and not self.waiting:
+                self.active += 1
+                return
+            if self.waiting >= self.queue_size:
+                raise self._shed('queue_full')
+            started = self._clock()
+            deadline = started + self.timeout
+            self.waiting += 1
+            try:
+                while self.active >= self.limit:
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        raise self._shed('queue_timeout')
+                    self._cond.wait(remaining)
+                self.active += 1
+            finally:
+                self.waiting -= 1
+                metrics.ADMISSION_WAIT.observe(self._clock() - started, route=self.name)
+
+    def release(self) -> None:
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+
+class TokenBuckets:
+    """Per-identity token buckets refilled at ``rate`` tokens per second up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int, max_identities: int = 100000,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_identities = max_identities
+        self._clock = clock
+        # identity -> (tokens, last refill); least recently seen first. An
+        # evicted identity comes back with a full bucket, which it would
+        # have refilled to by then anyway.
+        self._buckets: 'OrderedDict[Any, Tuple[float, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, identity: Any) -> float:
+        """Spend a token and return 0, or return the seconds until one is available."""
+        now = self._clock()
+        with self._lock:
+            tokens, updated = self._buckets.pop(identity, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[identity] = (tokens, now)
+            if len(self._buckets) > self.max_identities:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class AdmissionControl:
+    def __init__(self, read: Optional[Limiter], write: Optional[Limiter],
+                 buckets: Optional[TokenBuckets]) -> None:
+        self.limiters = {'read': read, 'write': write}
+        self.buckets = buckets
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['AdmissionControl']:
+        """Build from the ``ADMISSION_*`` and ``RATE_LIMIT_*`` keys; None if everything is disabled."""
+        def limiter(name: str) -> Optional[Limiter]:
+            limit = config[f'ADMISSION_{name.upper()}_CONCURRENCY']
+            if limit <= 0:
+                return None
+            return Limiter(name, limit, config[f'ADMISSION_{name.upper()}_QUEUE'],
+                           config['ADMISSION_QUEUE_TIMEOUT'], config['ADMISSION_RETRY_AFTER'])
+
+        buckets = None
+        if config['RATE_LIMIT_PER_SECOND'] > 0:
+            buckets = TokenBuckets(config['RATE_LIMIT_PER_SECOND'], config['RATE_LIMIT_BURST'])
+        read, write = limiter('read'), limiter('write')
+        if read is None and write is None and buckets is None:
+            return None
+        return cls(read, write, buckets)
+
+    def admit(self, identity: Any, method: str) -> Optional[Limiter]:
+        """Apply the rate limit, then wait for a slot; the caller must ``release`` what is returned."""
+        route = 'read' if method in SAFE_METHODS else 'write'
+        if self.buckets is not None:
+            wait = self.buckets.take(identity)
+            if wait:
+                metrics.ADMISSION_SHED.inc(route=route, reason='rate_limited')
+                raise Rejected(429, 'Rate limit exceeded; retry later.', wait)
+        limiter = self.limiters[route]
+        if limiter is not None:
+            limiter.acquire()
+        return limiter
+
+
+def _collect(attribute: str):
+    controller = current_app.extensions.get('admission') if has_app_context() else None
+    if controller is None:
+        return []
+    return [({'route': name}, getattr(limiter, attribute))
+            for name, limiter in controller.limiters.items() if limiter is not None]
+
+
+metrics.ADMISSION_QUEUE.collectors.append(lambda: _collect('waiting'))
+metrics.ADMISSION_IN_FLIGHT.collectors.append(lambda: _collect('active'))
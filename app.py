@@ -1,17 +1,137 @@
 from flask import Flask
+from flask.cli import with_appcontext
+from flask_jwt_extended import JWTManager
 from datetime import timedelta
-app_instance = Flask(__name__)
+import os
+import click
+import sqlite_profile
+from models import db
+from typing import Any, Dict, Optional
 
-# Configure the SQLAlchemy database URI
-app_instance.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///employees.db'
-app_instance.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app_instance.config['JWT_SECRET_KEY'] = 'my_jwt_secret_key'
-app_instance.config['USERNAME'] = "UserName"
-app_instance.config['PASSWORD'] = "UserSecret"
-app_instance.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)
+jwt = JWTManager()
+
+
+def create_app(config: Optional[Dict[str, Any]] = None) -> Flask:
+    """Build the application; ``config`` overrides the defaults below.
+
+    Nothing here touches the database, so workers, tests and CLI commands
+    start without schema reflection or DDL. Create the schema and apply
+    pending migrations with ``flask --app app init-db``.
+    """
+    app = Flask(__name__)
+
+    # Configure the SQLAlchemy database URI
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///employees.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Connection pool and PRAGMAs, see sqlite_profile.PROFILES
+    app.config['SQLITE_PROFILE'] = 'production'
+    app.config['JWT_SECRET_KEY'] = 'my_jwt_secret_key'
+    app.config['USERNAME'] = "UserName"
+    app.config['PASSWORD'] = "UserSecret"
+    app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)
+    # Cache of verified token claims, keyed by token digest (0 disables it);
+    # entries never outlive the token's exp, and TTL bounds them further
+    app.config['JWT_CLAIMS_CACHE_SIZE'] = 0
+    app.config['JWT_CLAIMS_CACHE_TTL'] = 300
+    app.config['JWT_CLAIMS_CACHE_BACKEND'] = None
+    # Rows per transaction for POST /api/employees/bulk
+    app.config['BULK_CHUNK_SIZE'] = 500
+    # Upper bound for ?ids= in the filter-based PATCH/DELETE on /api/employees
+    app.config['MAX_BULK_IDS'] = 10000
+    # Batch lookups (GET /api/employees?ids=, POST /api/employees/batch-get):
+    # ids accepted per request, and ids per IN (...) query
+    app.config['MAX_BATCH_GET_IDS'] = 1000
+    app.config['BATCH_GET_CHUNK_SIZE'] = 500
+    # Upper bound for ?limit= in the cursor mode of GET /api/employees
+    app.config['MAX_PAGE_SIZE'] = 100
+    # Searches matching more employees than this are returned in id order
+    # instead of ranked, since ranking scores every match on every page
+    app.config['SEARCH_MAX_RANKED_MATCHES'] = 5000
+    # Rows fetched per round trip while streaming GET /api/employees/export
+    app.config['EXPORT_BATCH_SIZE'] = 1000
+    # Tombstones older than this are purged from GET /api/employees/changes;
+    # clients whose ?since= predates a purge must resync from the full list
+    app.config['CHANGE_LOG_RETENTION'] = timedelta(days=7)
+    # Seconds between tombstone purges, which run from the change feed endpoint
+    app.config['CHANGE_LOG_PURGE_INTERVAL'] = 300
+    # Single-employee read-through cache; set EMPLOYEE_CACHE_BACKEND to a
+    # cache.CacheBackend instance to share it between processes
+    app.config['EMPLOYEE_CACHE_SIZE'] = 4096
+    app.config['EMPLOYEE_CACHE_TTL'] = 60
+    app.config['EMPLOYEE_CACHE_BACKEND'] = None
+    # Stored responses of POST /api/employees requests sent with an
+    # Idempotency-Key header. They are kept in the idempotency_keys table for
+    # TTL seconds, and SIZE completed ones are also cached in each process;
+    # set IDEMPOTENCY_CACHE_BACKEND to a shared backend to keep them there only
+    app.config['IDEMPOTENCY_CACHE_SIZE'] = 10000
+    app.config['IDEMPOTENCY_CACHE_TTL'] = 24 * 60 * 60
+    app.config['IDEMPOTENCY_CACHE_BACKEND'] = None
+    # Seconds between purges of expired keys from the idempotency_keys table
+    app.config['IDEMPOTENCY_PURGE_INTERVAL'] = 300
+    # Admission control for JWT-protected routes: requests handled at once
+    # and requests allowed to wait, for reads (GET/HEAD) and for writes.
+    # A concurrency of 0 turns that limit off
+    app.config['ADMISSION_READ_CONCURRENCY'] = 64
+    app.config['ADMISSION_READ_QUEUE'] = 256
+    app.config['ADMISSION_WRITE_CONCURRENCY'] = 4
+    app.config['ADMISSION_WRITE_QUEUE'] = 64
+    # Seconds a request may wait for a slot before it is shed with a 503,
+    # and the Retry-After sent with it
+    app.config['ADMISSION_QUEUE_TIMEOUT'] = 2.0
+    app.config['ADMISSION_RETRY_AFTER'] = 1
+    # Per-identity token bucket: sustained requests per second (0 disables
+    # it) and burst size; requests over it get a 429
+    app.config['RATE_LIMIT_PER_SECOND'] = 0
+    app.config['RATE_LIMIT_BURST'] = 50
+    # Add a Server-Timing header (app/db/jwt durations) to every response
+    app.config['SERVER_TIMING'] = False
+    # Requests slower than this are logged with the SQL they issued
+    app.config['SLOW_REQUEST_SECONDS'] = 0.5
+
+    app.config.update(config or {})
+    # Connection pool for the profile, unless the caller chose engine options
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', sqlite_profile.engine_options(app.config))
+
+    db.init_app(app)
+    jwt.init_app(app)
+
+    import admission
+    import cache
+    import idempotency
+    import metrics
+    import serializers
+    from view import api
+    app.json = serializers.JSONProvider(app)
+    # Read-through cache of serialized employees, keyed by id
+    app.extensions['employee_cache'] = cache.from_config(app.config)
+    # Responses of POST /api/employees, keyed by (identity, Idempotency-Key)
+    if app.config['IDEMPOTENCY_CACHE_BACKEND'] is not None:
+        app.extensions['idempotency_store'] = idempotency.IdempotencyStore(app.config['IDEMPOTENCY_CACHE_BACKEND'])
+    else:
+        app.extensions['idempotency_store'] = idempotency.DatabaseIdempotencyStore(
+            cache.from_config(app.config, 'IDEMPOTENCY_CACHE'), app.config['IDEMPOTENCY_CACHE_TTL'],
+            app.config['IDEMPOTENCY_PURGE_INTERVAL'])
+    # Verified token claims, keyed by token digest (see auth.verify_jwt)
+    if app.config['JWT_CLAIMS_CACHE_SIZE'] > 0 or app.config['JWT_CLAIMS_CACHE_BACKEND'] is not None:
+        app.extensions['jwt_claims_cache'] = cache.from_config(app.config, 'JWT_CLAIMS_CACHE')
+    # Concurrency limits and rate limits, see admission.AdmissionControl
+    app.extensions['admission'] = admission.AdmissionControl.from_config(app.config)
+    with app.app_context():
+        sqlite_profile.install(db.engine, app.config['SQLITE_PROFILE'])
+        metrics.install(app, db.engine)
+    app.register_blueprint(api)
+    app.cli.add_command(init_db_command)
+    return app
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command() -> None:
+    """Create missing tables and apply pending schema migrations."""
+    import migrations
+    ran = migrations.init_schema(db.engine)
+    click.echo(f"Applied migrations: {', '.join(map(str, ran))}" if ran else 'Schema is up to date.')
 
-with app_instance.app_context():
-    import view
 
 if __name__ == '__main__':
-    app_instance.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
@@ -0,0 +1,320 @@
+"""Optional async (ASGI) serving mode.
+
+Serves the ``/login`` and employee CRUD contract of ``view.py`` from async
+handlers over an ``AsyncSession`` (aiosqlite), so a single worker can keep
+many requests in flight while SQLite I/O happens off the event loop. It
+shares the models, migrations, serializers, cursor pagination and SQLite
+profile with the Flask app, and issues and accepts the same JWTs. Create the
+schema once, then run it with any ASGI server, e.g.:
+
+    flask --app app init-db
+    uvicorn asgi:app --port 8000
+
+Bulk ingest, export, ETags and the single-employee cache are only served by
+the Flask app.
+"""
+import math
+import os
+import re
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import parse_qs
+
+import jwt as pyjwt
+import sqlalchemy.exc
+from sqlalchemy import func, select
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+from app import create_app
+from models import Employee
+import migrations
+import pagination
+import serializers
+import sqlite_profile
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+Payload = Tuple[int, Any]
+
+
+class Request:
+    def __init__(self, scope: Dict[str, Any], body: bytes) -> None:
+        self.method: str = scope['method']
+        self.path: str = scope['path']
+        query: str = scope.get('query_string', b'').decode()
+        # Blank values are kept so ``?after=`` is validated like the Flask app does
+        self.args: Dict[str, str] = {key: values[0] for key, values in
+                                     parse_qs(query, keep_blank_values=True).items()}
+        self.headers: Dict[str, str] = {key.decode().lower(): value.decode() for key, value in scope['headers']}
+        self.body = body
+        self.identity: Optional[str] = None
+
+    def json(self) -> Any:
+        try:
+            return serializers.loads(self.body) if self.body else None
+        except ValueError:
+            return None
+
+    def arg_int(self, name: str, default: int) -> int:
+        try:
+            return int(self.args[name])
+        except (KeyError, ValueError):
+            return default
+
+
+def resolve_url(config: Dict[str, Any], instance_path: str) -> URL:
+    """The configured database on aiosqlite, with relative paths under the instance folder like Flask-SQLAlchemy."""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    database = url.database
+    if database and database != ':memory:' and not database.startswith('file:') and not os.path.isabs(database):
+        url = url.set(database=os.path.join(instance_path, database))
+    return url.set(drivername='sqlite+aiosqlite')
+
+
+def create_engine(config: Dict[str, Any], instance_path: str) -> AsyncEngine:
+    url = resolve_url(config, instance_path)
+    options = sqlite_profile.engine_options(config)
+    if options:
+        options['poolclass'] = AsyncAdaptedQueuePool
+    else:
+        options = {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+    engine = create_async_engine(url, **options)
+    sqlite_profile.install(engine.sync_engine, config['SQLITE_PROFILE'])
+    return engine
+
+
+def create_access_token(config: Dict[str, Any], identity: str) -> str:
+    """Encode the same access token ``flask_jwt_extended.create_access_token`` does."""
+    now = datetime.now(timezone.utc)
+    claims = {'fresh': False, 'iat': now, 'jti': str(uuid.uuid4()), 'type': 'access', 'sub': identity,
+              'nbf': now, 'exp': now + config['JWT_ACCESS_TOKEN_EXPIRES']}
+    return pyjwt.encode(claims, config['JWT_SECRET_KEY'], algorithm='HS256')
+
+
+def verify_token(config: Dict[str, Any], request: Request) -> Optional[Payload]:
+    """Set ``request.identity`` or return the error flask_jwt_extended would send."""
+    header = request.headers.get('authorization')
+    if header is None:
+        return 401, {'msg': 'Missing Authorization Header'}
+    scheme, _, token = header.partition(' ')
+    if scheme != 'Bearer' or not token:
+        return 422, {'msg': "Bad Authorization header. Expected 'Authorization: Bearer <JWT>'"}
+    try:
+        claims = pyjwt.decode(token, config['JWT_SECRET_KEY'], algorithms=['HS256'])
+    except pyjwt.ExpiredSignatureError:
+        return 401, {'msg': 'Token has expired'}
+    except pyjwt.InvalidTokenError as e:
+        return 422, {'msg': str(e)}
+    if claims.get('type') != 'access':
+        return 422, {'msg': 'Only non-refresh tokens are allowed'}
+    request.identity = claims['sub']
+    return None
+
+
+class AsyncApp:
+    def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """``config`` overrides the Flask app's defaults, as in ``create_app``."""
+        flask_app = create_app(config)
+        self.config = flask_app.config
+        self.engine = create_engine(self.config, flask_app.instance_path)
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.routes: List[Tuple[str, re.Pattern, Callable[..., Awaitable[Payload]], bool]] = [
+            ('POST', re.compile(r'/login'), self.login, False),
+            ('POST', re.compile(r'/api/employees'), self.create_employee, True),
+            ('GET', re.compile(r'/api/employees'), self.get_employees, True),
+            ('GET', re.compile(r'/api/employees/(?P<id>\d+)'), self.get_employee, True),
+            ('PUT', re.compile(r'/api/employees/(?P<id>\d+)'), self.update_employee, True),
+            ('DELETE', re.compile(r'/api/employees/(?P<id>\d+)'), self.delete_employee, True),
+        ]
+
+    async def init_schema(self) -> List[int]:
+        """Create missing tables and apply migrations, like ``flask --app app init-db``."""
+        async with self.engine.begin() as conn:
+            return await conn.run_sync(migrations.setup)
+
+    async def startup(self) -> None:
+        # Connect once so a missing or unreadable database fails the boot
+        async with self.engine.connect() as conn:
+            await conn.exec_driver_sql('SELECT 1')
+
+    async def shutdown(self) -> None:
+        await self.engine.dispose()
+
+    async def __call__(self, scope: Dict[str, Any], receive, send) -> None:
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+        status, payload = await self.dispatch(Request(scope, body))
+        content = serializers.dumps(payload).encode()
+        await send({'type': 'http.response.start', 'status': status, 'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(content)).encode()),
+        ]})
+        await send({'type': 'http.response.body', 'body': content})
+
+    async def lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await self.startup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def dispatch(self, request: Request) -> Payload:
+        path_matched = False
+        for method, pattern, handler, protected in self.routes:
+            match = pattern.fullmatch(request.path)
+            if match is None:
+                continue
+            path_matched = True
+            if method != request.method:
+                continue
+            if protected:
+                error = verify_token(self.config, request)
+                if error is not None:
+                    return error
+            return await handler(request, **{key: int(value) for key, value in match.groupdict().items()})
+        if path_matched:
+            return 405, {'message': 'Method not allowed'}
+        return 404, {'message': 'Not found'}
+
+    async def login(self, request: Request) -> Payload:
+        data: Dict[str, Any] = request.json() or {}
+        username = data.get('username')
+        password = data.get('password')
+
+        if username != self.config['USERNAME'] or password != self.config['PASSWORD']:
+            return 401, {'message': 'Invalid username or password'}
+
+        return 200, {'access_token': create_access_token(self.config, username)}
+
+    async def create_employee(self, request: Request) -> Payload:
+        data: Dict[str, Any] = request.json()
+
+        async with self.session() as session:
+            try:
+                session.add(Employee(
+                    name=data['name'],
+                    email=data['email'],
+                    department=data.get('department'),
+                    role=data.get('role')
+                ))
+                await session.commit()
+            except sqlalchemy.exc.IntegrityError:
+                await session.rollback()
+                return 400, {'message': 'Employee should have a unique name and email.'}
+            except Exception as e:
+                await session.rollback()
+                return 400, {'message': str(e)}
+
+        return 201, {'message': 'Employee created successfully!'}
+
+    async def get_employees(self, request: Request) -> Payload:
+        department: Optional[str] = request.args.get('department')
+        role: Optional[str] = request.args.get('role')
+        page: int = max(request.arg_int('page', 1), 1)
+        per_page: int = 10
+        filters = []
+        if department:
+            filters.append(Employee.department == department)
+
+        if role:
+            filters.append(Employee.role == role)
+
+        async with self.session() as session:
+            if 'after' in request.args or 'limit' in request.args:
+                return await self.get_employees_after_cursor(session, request, filters)
+
+            total: int = await session.scalar(select(func.count(Employee.id)).where(*filters))
+            rows = (await session.execute(
+                select(*serializers.EMPLOYEE_COLUMNS).where(*filters)
+                .limit(per_page).offset((page - 1) * per_page)
+            )).all()
+        return 200, {
+            'total': total,
+            'pages': math.ceil(total / per_page),
+            'current_page': page,
+            'employees': [serializers.employee_from_row(row) for row in rows]
+        }
+
+    async def get_employees_after_cursor(self, session, request: Request, filters: list) -> Payload:
+        sort: str = request.args.get('sort', 'id')
+        limit: int = max(1, min(request.arg_int('limit', 10), self.config['MAX_PAGE_SIZE']))
+        try:
+            page_query = pagination.seek(select(*serializers.EMPLOYEE_COLUMNS).where(*filters), sort,
+                                         request.args.get('after') or None)
+        except pagination.CursorError as e:
+            return 400, {'message': str(e)}
+
+        rows = (await session.execute(page_query.limit(limit + 1))).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        response: Dict[str, Any] = {
+            'limit': limit,
+            'next_cursor': pagination.encode_cursor(sort, rows[-1]) if has_more else None,
+            'employees': [serializers.employee_from_row(row) for row in rows]
+        }
+        if request.args.get('include_total', 'false').lower() in ('1', 'true', 'yes'):
+            response['total'] = await session.scalar(select(func.count(Employee.id)).where(*filters))
+        return 200, response
+
+    async def get_employee(self, request: Request, id: int) -> Payload:
+        async with self.session() as session:
+            row = (await session.execute(
+                select(*serializers.EMPLOYEE_COLUMNS).where(Employee.id == id)
+            )).first()
+        if row is None:
+            return 404, {'message': 'Employee not found'}
+        return 200, serializers.employee_from_row(row)
+
+    async def update_employee(self, request: Request, id: int) -> Payload:
+        data: Dict[str, Any] = request.json()
+
+        async with self.session() as session:
+            try:
+                employee: Optional[Employee] = await session.get(Employee, id)
+                if employee is None:
+                    return 404, {'message': 'Employee not found'}
+                employee.name = data['name']
+                employee.email = data['email']
+                employee.department = data.get('department')
+                employee.role = data.get('role')
+                await session.commit()
+            except StaleDataError:
+                await session.rollback()
+                return 412, {'message': 'Employee was modified by another request.'}
+            except sqlalchemy.exc.IntegrityError:
+                await session.rollback()
+                return 400, {'message': 'Error: An employee with this email already exists.'}
+            except Exception as e:
+                await session.rollback()
+                return 500, {'message': 'An error occurred.', 'error': str(e)}
+
+        return 200, {'message': 'Employee updated successfully!'}
+
+    async def delete_employee(self, request: Request, id: int) -> Payload:
+        async with self.session() as session:
+            try:
+                employee: Optional[Employee] = await session.get(Employee, id)
+                if employee is None:
+                    return 404, {'message': 'Employee Id not found.'}
+                await session.delete(employee)
+                await session.commit()
+                return 200, {'message': 'Employee deleted successfully!'}
+            except Exception:
+                await session.rollback()
+                return 400, {'message': 'An error occurred'}
+
+
+app = AsyncApp()
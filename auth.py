@@ -0,0 +1,100 @@
+import hashlib
+import time
+from functools import wraps
+from time import perf_counter
+from flask import current_app, g, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.config import config
+from flask_jwt_extended.internal_utils import (custom_verification_for_token, has_user_lookup, user_lookup,
+                                               verify_token_not_blocklisted)
+from flask_jwt_extended.exceptions import UserLookupError
+from typing import Any, Dict, Optional, Tuple
+import admission
+import metrics
+
+
+def jwt_required():
+    """``flask_jwt_extended.jwt_required`` that also records verification time.
+
+    Verified requests then pass admission control (see ``admission.py``)
+    when it is enabled, and are answered with its 429/503 if rejected.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            started = perf_counter()
+            try:
+                verify_jwt()
+            finally:
+                metrics.record_jwt_time(perf_counter() - started)
+            controller: Optional[admission.AdmissionControl] = current_app.extensions.get('admission')
+            if controller is None:
+                return current_app.ensure_sync(fn)(*args, **kwargs)
+            try:
+                limiter = controller.admit(get_jwt_identity(), request.method)
+            except admission.Rejected as e:
+                return e.response()
+            try:
+                return current_app.ensure_sync(fn)(*args, **kwargs)
+            finally:
+                if limiter is not None:
+                    limiter.release()
+        return decorator
+    return wrapper
+
+
+def _bearer_token() -> Optional[str]:
+    """The token of a plain ``Authorization: Bearer <token>`` header, else None."""
+    if list(config.token_location) != ['headers'] or request.method in config.exempt_methods:
+        return None
+    parts = request.headers.get(config.header_name, '').split()
+    if config.header_type:
+        return parts[1] if len(parts) == 2 and parts[0] == config.header_type else None
+    return parts[0] if len(parts) == 1 else None
+
+
+def verify_jwt() -> None:
+    """``verify_jwt_in_request``, skipping decode and HMAC for tokens verified before.
+
+    With ``JWT_CLAIMS_CACHE_SIZE`` (or ``JWT_CLAIMS_CACHE_BACKEND``) set, the
+    claims of each verified token are cached under the token's SHA-256.
+    Entries are dropped once the token's ``exp`` has passed, and every hit
+    still goes through the blocklist, claims verification and user lookup
+    callbacks, so revoking a token takes effect immediately.
+    """
+    claims_cache = current_app.extensions.get('jwt_claims_cache')
+    token = _bearer_token() if claims_cache is not None else None
+    if token is None:
+        verify_jwt_in_request()
+        return
+
+    key = hashlib.sha256(token.encode()).digest()
+    cached: Optional[Tuple[Dict[str, Any], Dict[str, Any]]] = claims_cache.get(key)
+    if cached is not None and cached[1]['exp'] > time.time():
+        metrics.JWT_CLAIMS_CACHE.inc(result='hit')
+        jwt_header, jwt_data = cached
+        verify_token_not_blocklisted(jwt_header, jwt_data)
+        custom_verification_for_token(jwt_header, jwt_data)
+        _set_request_jwt(jwt_header, jwt_data)
+        return
+
+    metrics.JWT_CLAIMS_CACHE.inc(result='miss')
+    if cached is not None:
+        claims_cache.delete(key)
+    jwt_header, jwt_data = verify_jwt_in_request()
+    if 'exp' in jwt_data:
+        claims_cache.set(key, (jwt_header, jwt_data))
+
+
+def _set_request_jwt(jwt_header: Dict[str, Any], jwt_data: Dict[str, Any]) -> None:
+    """Expose cached claims the way ``verify_jwt_in_request`` does, for ``get_jwt_identity`` and friends."""
+    loaded_user = None
+    if has_user_lookup():
+        loaded_user = user_lookup(jwt_header, jwt_data)
+        if loaded_user is None:
+            raise UserLookupError(f'Error loading the user {jwt_data[config.identity_claim_key]}',
+                                  jwt_header, jwt_data)
+    g._jwt_extended_jwt_user = {'loaded_user': loaded_user}
+    g._jwt_extended_jwt_header = jwt_header
+    g._jwt_extended_jwt = jwt_data
+    g._jwt_extended_jwt_location = 'headers'
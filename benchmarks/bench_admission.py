@@ -0,0 +1,95 @@
+"""Read latency during a write burst, with and without admission control.
+
+Seeds a database, then runs ``get`` requests while ``--writers`` threads
+flood ``POST /api/employees``, all in-process through the Flask test
+client. It runs once with the read/write limits off and once with them on
+(``--write-concurrency``), and prints read throughput and p50/p99 plus how
+many writes were admitted or shed. Run from the repository root:
+
+    python benchmarks/bench_admission.py --writers 32 --readers 8
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+from bench_endpoints import TestClientDriver, run_scenario, seed
+
+
+def measure(database_uri: str, rows: int, args: argparse.Namespace, admission: bool) -> Dict[str, Any]:
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+
+    limits = {} if admission else {'ADMISSION_READ_CONCURRENCY': 0, 'ADMISSION_WRITE_CONCURRENCY': 0}
+    if admission:
+        limits['ADMISSION_WRITE_CONCURRENCY'] = args.write_concurrency
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_uri, **limits})
+    with app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity=app.config['USERNAME'])}"}
+    driver = TestClientDriver(app)
+    rng = random.Random(7)
+    run_id = f'{int(time.time() * 1000)}{"a" if admission else "n"}'
+    stop = threading.Event()
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+
+    def write(worker: int) -> None:
+        i = 0
+        while not stop.is_set():
+            status, _ = driver.request('POST', '/api/employees', headers, {
+                'name': f'Burst {run_id} {worker} {i}', 'email': f'burst.{run_id}.{worker}.{i}@example.com'})
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+            i += 1
+
+    with ThreadPoolExecutor(max_workers=args.writers) as writers:
+        for worker in range(args.writers):
+            writers.submit(write, worker)
+        time.sleep(0.5)  # let the burst build up
+        reads = run_scenario('get', lambda i: driver.request(
+            'GET', f'/api/employees/{rng.randint(1, rows)}', headers)[0] == 200, args.requests, args.readers)
+        stop.set()
+
+    return {'admission': admission, 'reads': reads,
+            'writes': {str(status): count for status, count in sorted(statuses.items())}}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--database', default=os.path.join(tempfile.gettempdir(), 'bench_admission.db'))
+    parser.add_argument('--writers', type=int, default=32)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=1000, help='reads measured per run')
+    parser.add_argument('--write-concurrency', type=int, default=2)
+    parser.add_argument('--output', help='write the JSON report to this file as well as stdout')
+    args = parser.parse_args()
+
+    from app import create_app
+    database_uri = f'sqlite:///{os.path.abspath(args.database)}'
+    seed(create_app({'SQLALCHEMY_DATABASE_URI': database_uri}), args.rows, random.Random(42))
+
+    report = {
+        'rows': args.rows,
+        'writers': args.writers,
+        'readers': args.readers,
+        'python': platform.python_version(),
+        'results': [measure(database_uri, args.rows, args, admission=False),
+                    measure(database_uri, args.rows, args, admission=True)],
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Compare the Flask (threaded WSGI) app with the async ASGI app under load.
+
+Starts both servers on the same seeded database, one after the other, and
+drives each with ``bench_endpoints.py`` over HTTP at high concurrency.
+Needs an ASGI server (uvicorn) installed. Run from the repository root:
+
+    python benchmarks/bench_async.py --rows 100000 --concurrency 64
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_ENDPOINTS = os.path.join(ROOT, 'benchmarks', 'bench_endpoints.py')
+SERVERS = {
+    'sync': lambda port: [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', str(port), '--with-threads'],
+    'async': lambda port: [sys.executable, '-m', 'uvicorn', 'asgi:app', '--port', str(port), '--log-level', 'warning'],
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def server(command: List[str], port: int, env: Dict[str, str]) -> Iterator[str]:
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f'{command[2:]} did not start')
+                time.sleep(0.1)
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--database', default=os.path.join(tempfile.gettempdir(), 'bench_async.db'))
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--scenarios', default='list,list_department,get,create')
+    args = parser.parse_args()
+
+    env = {**os.environ, 'DATABASE_URL': f'sqlite:///{os.path.abspath(args.database)}'}
+    reports = {}
+    for name, command in SERVERS.items():
+        port = free_port()
+        with server(command(port), port, env) as url:
+            output = subprocess.run([
+                sys.executable, BENCH_ENDPOINTS, '--url', url, '--database', args.database,
+                '--rows', str(args.rows), '--concurrency', str(args.concurrency),
+                '--requests', str(args.requests), '--scenarios', args.scenarios,
+            ], cwd=ROOT, env=env, check=True, capture_output=True, text=True).stdout
+        reports[name] = {result['scenario']: result for result in json.loads(output)['results']}
+
+    comparison = []
+    for scenario, sync_result in reports['sync'].items():
+        async_result = reports['async'][scenario]
+        comparison.append({
+            'scenario': scenario,
+            'sync_rps': sync_result['throughput_rps'],
+            'async_rps': async_result['throughput_rps'],
+            'sync_p99_ms': sync_result['p99_ms'],
+            'async_p99_ms': async_result['p99_ms'],
+            'sync_errors': sync_result['errors'],
+            'async_errors': async_result['errors'],
+        })
+    print(json.dumps({'rows': args.rows, 'concurrency': args.concurrency, 'results': comparison}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
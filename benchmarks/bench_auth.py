@@ -0,0 +1,79 @@
+"""Per-request authentication overhead with the verified token cache on and off.
+
+Times ``auth.verify_jwt`` directly inside a request context (the pure auth
+cost) and full ``GET /api/cache/stats`` round trips through the test client
+(the cheapest protected route), once with ``JWT_CLAIMS_CACHE_SIZE=0`` and
+once with the cache enabled, and prints one JSON report. Run from the
+repository root:
+
+    python benchmarks/bench_auth.py --requests 20000
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def summarize(latencies: List[float]) -> Dict[str, Any]:
+    latencies.sort()
+    return {
+        'mean_us': round(statistics.fmean(latencies) * 1e6, 2),
+        'p50_us': round(latencies[len(latencies) // 2] * 1e6, 2),
+        'p99_us': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6, 2),
+    }
+
+
+def measure(cache_size: int, requests: int) -> Dict[str, Any]:
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    import auth
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:', 'JWT_CLAIMS_CACHE_SIZE': cache_size})
+    with app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity=app.config['USERNAME'])}"}
+
+    verify: List[float] = []
+    with app.test_request_context('/api/cache/stats', headers=headers):
+        for _ in range(requests):
+            started = time.perf_counter()
+            auth.verify_jwt()
+            verify.append(time.perf_counter() - started)
+
+    client = app.test_client()
+    round_trip: List[float] = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        status = client.get('/api/cache/stats', headers=headers).status_code
+        round_trip.append(time.perf_counter() - started)
+        if status != 200:
+            sys.exit(f'Request failed with status {status}')
+    return {'cache_size': cache_size, 'verify_jwt': summarize(verify), 'request': summarize(round_trip)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--cache-size', type=int, default=1000, help='JWT_CLAIMS_CACHE_SIZE for the cached run')
+    parser.add_argument('--output', help='write the JSON report to this file as well as stdout')
+    args = parser.parse_args()
+
+    report = {
+        'requests': args.requests,
+        'python': platform.python_version(),
+        'results': [measure(0, args.requests), measure(args.cache_size, args.requests)],
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
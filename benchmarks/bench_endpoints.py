@@ -0,0 +1,267 @@
+"""Load benchmark for every employee endpoint.
+
+Seeds a SQLite database with a realistic department/role mix, then drives
+each route at a fixed concurrency, either in-process through the Flask test
+client or over HTTP against a running server, and prints one JSON report
+with throughput and p50/p95/p99 latency per scenario. Run from the
+repository root, e.g.:
+
+    python benchmarks/bench_endpoints.py --rows 100000 --concurrency 8
+    DATABASE_URL=sqlite:////tmp/bench.db python app.py &
+    python benchmarks/bench_endpoints.py --database /tmp/bench.db --url http://127.0.0.1:5000
+
+Seeding is skipped when the database already holds ``--rows`` employees, so
+large datasets (``--rows 1000000``) only have to be generated once.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (department, share of headcount, [(role, share within department), ...])
+DEPARTMENTS = [
+    ('Engineering', 0.35, [('Developer', 0.6), ('Senior Developer', 0.25), ('Manager', 0.1), ('Director', 0.05)]),
+    ('Sales', 0.20, [('Account Executive', 0.7), ('Sales Manager', 0.25), ('Director', 0.05)]),
+    ('Support', 0.15, [('Support Agent', 0.85), ('Manager', 0.15)]),
+    ('Marketing', 0.10, [('Marketer', 0.8), ('Manager', 0.2)]),
+    ('Operations', 0.08, [('Analyst', 0.7), ('Manager', 0.3)]),
+    ('HR', 0.05, [('Recruiter', 0.6), ('HR Partner', 0.3), ('Manager', 0.1)]),
+    ('Finance', 0.05, [('Accountant', 0.75), ('Controller', 0.25)]),
+    ('Legal', 0.02, [('Counsel', 0.9), ('General Counsel', 0.1)]),
+]
+SEED_CHUNK = 10000
+
+
+def pick(rng: random.Random, weighted: List[Tuple[Any, float]]) -> Any:
+    return rng.choices([value for value, _ in weighted], weights=[weight for _, weight in weighted])[0]
+
+
+def department_and_role(rng: random.Random) -> Tuple[str, str]:
+    department, _, roles = rng.choices(DEPARTMENTS, weights=[share for _, share, _ in DEPARTMENTS])[0]
+    return department, pick(rng, roles)
+
+
+def seed(app, rows: int, rng: random.Random) -> None:
+    """Create the schema and fill it with exactly ``rows`` employees, ids 1..rows."""
+    from sqlalchemy import delete, func, insert, select
+    from models import Employee, db
+    import migrations
+
+    with app.app_context():
+        migrations.init_schema(db.engine)
+        if db.session.scalar(select(func.count(Employee.id))) == rows:
+            return
+        db.session.execute(delete(Employee))
+        db.session.commit()
+        start = datetime(2015, 1, 1)
+        for offset in range(0, rows, SEED_CHUNK):
+            batch = []
+            for i in range(offset, min(offset + SEED_CHUNK, rows)):
+                department, role = department_and_role(rng)
+                batch.append({
+                    'name': f'Employee {i:07d}',
+                    'email': f'employee{i:07d}@example.com',
+                    'department': department,
+                    'role': role,
+                    'date_joined': start + timedelta(days=rng.randrange(3650)),
+                })
+            db.session.execute(insert(Employee.__table__), batch)
+            db.session.commit()
+
+
+class TestClientDriver:
+    """Sends requests in-process; each worker thread gets its own test client."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.local = threading.local()
+
+    def request(self, method: str, path: str, headers: Optional[Dict[str, str]] = None,
+                json_body: Any = None) -> Tuple[int, Any]:
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(path, method=method, headers=headers, json=json_body)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HTTPDriver:
+    """Sends requests to a running server; each worker thread keeps one connection."""
+
+    def __init__(self, base_url: str) -> None:
+        import requests
+        self.requests = requests
+        self.base_url = base_url.rstrip('/')
+        self.local = threading.local()
+
+    def request(self, method: str, path: str, headers: Optional[Dict[str, str]] = None,
+                json_body: Any = None) -> Tuple[int, Any]:
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = self.requests.Session()
+        response = session.request(method, self.base_url + path, headers=headers, json=json_body)
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, None
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(name: str, call: Callable[[int], bool], requests: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = [0.0] * requests
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        ok = call(i)
+        latencies[i] = time.perf_counter() - started
+        if not ok:
+            with lock:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'scenario': name,
+        'requests': requests,
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(requests / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def build_scenarios(driver, token: str, rows: int, run_id: str, rng: random.Random,
+                    login: Dict[str, str], created_ids: List[int]) -> Dict[str, Callable[[int], bool]]:
+    """Return one request function per scenario.
+
+    ``create`` names its employees after ``run_id``; ``delete`` pops ids from
+    ``created_ids``, which the caller fills with those employees.
+    """
+    headers = {'Authorization': f'Bearer {token}'}
+    department, role = department_and_role(rng)
+    ids_lock = threading.Lock()
+
+    def random_id() -> int:
+        return rng.randint(1, rows)
+
+    def create(i: int) -> bool:
+        status, _ = driver.request('POST', '/api/employees', headers, {
+            'name': f'Bench {run_id} {i}', 'email': f'bench.{run_id}.{i}@example.com',
+            'department': department, 'role': role
+        })
+        return status == 201
+
+    def put(i: int) -> bool:
+        employee_id = random_id()
+        status, _ = driver.request('PUT', f'/api/employees/{employee_id}', headers, {
+            'name': f'Employee {employee_id - 1:07d}', 'email': f'employee{employee_id - 1:07d}@example.com',
+            'department': department, 'role': role
+        })
+        return status in (200, 404)
+
+    def delete(i: int) -> bool:
+        with ids_lock:
+            if not created_ids:
+                return False
+            employee_id = created_ids.pop()
+        status, _ = driver.request('DELETE', f'/api/employees/{employee_id}', headers)
+        return status == 200
+
+    def get(path: str, ok: Tuple[int, ...] = (200,)) -> Callable[[int], bool]:
+        return lambda i: driver.request('GET', path, headers)[0] in ok
+
+    return {
+        'login': lambda i: driver.request('POST', '/login', None, login)[0] == 200,
+        'list': get('/api/employees'),
+        'list_department': get(f'/api/employees?department={department}'),
+        'list_role': get(f'/api/employees?role={role}'),
+        'list_department_role': get(f'/api/employees?department={department}&role={role}'),
+        'list_cursor': get(f'/api/employees?department={department}&limit=10'),
+        'get': lambda i: driver.request('GET', f'/api/employees/{random_id()}', headers)[0] in (200, 404),
+        'create': create,
+        'put': put,
+        'delete': delete,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000, help='employees to seed (e.g. 1000, 100000, 1000000)')
+    parser.add_argument('--database', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench.db'))
+    parser.add_argument('--url', help='benchmark a running server instead of the in-process test client')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--requests', type=int, default=500, help='requests per scenario')
+    parser.add_argument('--scenarios', help='comma separated subset of scenarios to run')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the JSON report to this file as well as stdout')
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(args.database)}'})
+    rng = random.Random(args.seed)
+    seed(app, args.rows, rng)
+
+    driver = HTTPDriver(args.url) if args.url else TestClientDriver(app)
+    login = {'username': app.config['USERNAME'], 'password': app.config['PASSWORD']}
+    status, body = driver.request('POST', '/login', None, login)
+    if status != 200:
+        sys.exit(f'Login failed with status {status}')
+
+    run_id = f'{int(time.time())}{rng.randrange(1000):03d}'
+    created_ids: List[int] = []
+    scenarios = build_scenarios(driver, body['access_token'], args.rows, run_id, rng, login, created_ids)
+    selected = args.scenarios.split(',') if args.scenarios else list(scenarios)
+
+    results = []
+    for name in selected:
+        if name == 'delete':
+            # Delete only what this run created so the dataset keeps its size
+            from sqlalchemy import select
+            from models import Employee, db
+            with app.app_context():
+                created_ids.extend(db.session.scalars(
+                    select(Employee.id).where(Employee.name.like(f'Bench {run_id} %'))))
+        requests = min(args.requests, len(created_ids)) if name == 'delete' else args.requests
+        if requests:
+            results.append(run_scenario(name, scenarios[name], requests, args.concurrency))
+
+    report = {
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'mode': 'http' if args.url else 'test_client',
+        'rows': args.rows,
+        'concurrency': args.concurrency,
+        'requests_per_scenario': args.requests,
+        'python': platform.python_version(),
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
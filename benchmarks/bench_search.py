@@ -0,0 +1,96 @@
+"""Search latency on a large table, with ranking capped and uncapped.
+
+Seeds the same dataset as ``bench_endpoints.py`` (reusing its database when
+it already holds ``--rows`` employees), then times the first and second
+page of ``GET /api/employees/search`` for broad and narrow queries, once
+with the default ``SEARCH_MAX_RANKED_MATCHES`` and once with ranking every
+match, and prints one JSON report. Run from the repository root:
+
+    python benchmarks/bench_search.py --rows 1000000
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_endpoints import seed
+
+# Every employee matches 'employee' and 'example'; about 2% are Counsel,
+# 0.2% General Counsel, and one employee has each email
+QUERIES = ['employee', 'example com', 'counsel', 'general counsel', 'employee0001234']
+
+
+def summarize(latencies: List[float]) -> Dict[str, Any]:
+    latencies.sort()
+    return {
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2),
+    }
+
+
+def measure(app, max_ranked: int, requests: int) -> Dict[str, Any]:
+    from flask_jwt_extended import create_access_token
+
+    app.config['SEARCH_MAX_RANKED_MATCHES'] = max_ranked
+    with app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity=app.config['USERNAME'])}"}
+    client = app.test_client()
+    results = []
+    for q in QUERIES:
+        pages: List[List[float]] = [[], []]
+        ranked = None
+        for _ in range(requests):
+            url = f'/api/employees/search?q={q}&limit=10'
+            for latencies in pages:
+                started = time.perf_counter()
+                response = client.get(url, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    sys.exit(f'{url} failed with status {response.status_code}')
+                data = response.get_json()
+                ranked = data['ranked'] if ranked is None else ranked
+                if data['next_cursor'] is None:
+                    break
+                url = f"/api/employees/search?q={q}&limit=10&after={data['next_cursor']}"
+        results.append({'q': q, 'ranked': ranked, 'page_1': summarize(pages[0]),
+                        'page_2': summarize(pages[1]) if pages[1] else None})
+    return {'max_ranked_matches': max_ranked, 'queries': results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--database', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench.db'))
+    parser.add_argument('--requests', type=int, default=5, help='timed requests per query and page')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the JSON report to this file as well as stdout')
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(args.database)}'})
+    seed(app, args.rows, random.Random(args.seed))
+
+    report = {
+        'rows': args.rows,
+        'requests': args.requests,
+        'python': platform.python_version(),
+        'results': [measure(app, app.config['SEARCH_MAX_RANKED_MATCHES'], args.requests),
+                    measure(app, args.rows, args.requests)],
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
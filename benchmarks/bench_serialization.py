@@ -0,0 +1,90 @@
+"""Micro-benchmark of the employee list serialization path.
+
+Compares the previous path (hydrate ORM objects, build the dict inline,
+encode with the stdlib provider) with the ``serializers`` path (column-only
+rows, shared row mapper, orjson provider when installed) at several page
+sizes. Run from the repository root:
+
+    python benchmarks/bench_serialization.py [--rows 1000] [--repeat 200]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from app import create_app
+from models import Employee
+import serializers
+
+PAGE_SIZES = (10, 100, 1000)
+
+
+def seed(session: Session, rows: int) -> None:
+    session.execute(Employee.__table__.insert(), [{
+        'name': f'Employee {i}',
+        'email': f'employee{i}@example.com',
+        'department': f'Department {i % 20}',
+        'role': f'Role {i % 7}',
+        'date_joined': datetime(2024, 1, 1)
+    } for i in range(rows)])
+    session.commit()
+
+
+def legacy_page(session: Session, provider: DefaultJSONProvider, per_page: int) -> str:
+    employees = session.query(Employee).limit(per_page).all()
+    body = provider.dumps({'employees': [{
+        'id': emp.id,
+        'name': emp.name,
+        'email': emp.email,
+        'department': emp.department,
+        'role': emp.role,
+        'joining_date': emp.date_joined.isoformat()
+    } for emp in employees]}, separators=(',', ':'))
+    # Drop the objects so every iteration pays for hydration again
+    session.expunge_all()
+    return body
+
+
+def serializer_page(session: Session, provider: DefaultJSONProvider, per_page: int) -> str:
+    rows = session.execute(select(*serializers.EMPLOYEE_COLUMNS).limit(per_page)).all()
+    return provider.dumps({'employees': [serializers.employee_from_row(row) for row in rows]})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=max(PAGE_SIZES))
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    Employee.__table__.create(engine)
+    app = create_app()
+    legacy_provider = DefaultJSONProvider(app)
+    fast_provider = serializers.JSONProvider(app)
+    results = []
+    with Session(engine) as session:
+        seed(session, args.rows)
+        assert json.loads(legacy_page(session, legacy_provider, 10)) == \
+            json.loads(serializer_page(session, fast_provider, 10))
+        for per_page in PAGE_SIZES:
+            row = {'per_page': per_page}
+            for name, path, provider in (('legacy', legacy_page, legacy_provider),
+                                         ('serializer', serializer_page, fast_provider)):
+                seconds = min(timeit.repeat(lambda: path(session, provider, per_page),
+                                            number=args.repeat, repeat=3))
+                row[f'{name}_us'] = round(seconds / args.repeat * 1e6, 1)
+            row['speedup'] = round(row['legacy_us'] / row['serializer_us'], 2)
+            results.append(row)
+
+    print(json.dumps({'encoder': 'orjson' if serializers.orjson else 'json', 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Cold-start benchmark: how long a fresh worker takes to serve its first request.
+
+Each run starts a new interpreter that imports the app, calls
+``create_app()``, optionally runs the schema setup that every boot used to
+pay for (``--init-db-each-boot``), then logs in and lists employees. The
+phases are timed inside the child and the whole process from outside, and
+one JSON report with the median and p95 of each phase is printed. Run from
+the repository root:
+
+    python benchmarks/bench_startup.py --runs 20
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app({'SQLALCHEMY_DATABASE_URI': sys.argv[1]})
+created = time.perf_counter()
+if sys.argv[2] == '1':
+    import migrations
+    from models import db
+    with app.app_context():
+        migrations.init_schema(db.engine)
+schema = time.perf_counter()
+client = app.test_client()
+token = client.post('/login', json={'username': app.config['USERNAME'],
+                                    'password': app.config['PASSWORD']}).get_json()['access_token']
+status = client.get('/api/employees', headers={'Authorization': f'Bearer {token}'}).status_code
+served = time.perf_counter()
+print(json.dumps({'import_s': imported - started, 'create_app_s': created - imported,
+                  'init_schema_s': schema - created, 'first_request_s': served - schema,
+                  'status': status}))
+'''
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def boot(database_uri: str, init_db: bool) -> Dict[str, Any]:
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', CHILD, database_uri, '1' if init_db else '0'],
+                            cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.splitlines()[-1])
+    result['process_s'] = time.perf_counter() - started
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--database', default=os.path.join(tempfile.gettempdir(), 'bench_startup.db'))
+    parser.add_argument('--init-db-each-boot', action='store_true',
+                        help='also run create_all and the migrations on every boot, as startup used to')
+    parser.add_argument('--output', help='write the JSON report to this file as well as stdout')
+    args = parser.parse_args()
+
+    database_uri = f'sqlite:///{os.path.abspath(args.database)}'
+    # Warm-up boot: creates the schema once and fills the OS file cache
+    boot(database_uri, init_db=True)
+    runs = [boot(database_uri, args.init_db_each_boot) for _ in range(args.runs)]
+    if any(run['status'] != 200 for run in runs):
+        sys.exit('First request failed; see the child output')
+
+    phases = {}
+    for phase in ('import_s', 'create_app_s', 'init_schema_s', 'first_request_s', 'process_s'):
+        values = [run[phase] for run in runs]
+        phases[phase.removesuffix('_s')] = {
+            'median_ms': round(statistics.median(values) * 1000, 3),
+            'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+        }
+    report = {
+        'runs': args.runs,
+        'init_db_each_boot': args.init_db_each_boot,
+        'python': platform.python_version(),
+        'phases': phases,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
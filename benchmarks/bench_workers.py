@@ -0,0 +1,89 @@
+"""Throughput of the pre-fork server (``server.py``) as workers are added.
+
+Seeds one database, then for each ``--workers`` count starts ``server.py``,
+waits for ``/readyz`` and drives it with ``bench_endpoints.py`` over HTTP,
+printing requests per second and p99 latency per scenario and worker count.
+Reads should scale with workers up to the number of cores; writes are
+serialized by SQLite's single writer lock. Run from the repository root:
+
+    python benchmarks/bench_workers.py --workers 1,2,4,8 --concurrency 32
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+import requests
+
+from bench_async import BENCH_ENDPOINTS, ROOT, free_port
+from bench_endpoints import seed
+
+
+@contextmanager
+def server(workers: int, env: Dict[str, str]) -> Iterator[str]:
+    port = free_port()
+    process = subprocess.Popen([sys.executable, 'server.py', '--bind', f'127.0.0.1:{port}', '--workers', str(workers)],
+                               cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if requests.get(f'{url}/readyz', timeout=5).status_code == 200:
+                    break
+            except requests.ConnectionError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError(f'server.py --workers {workers} did not become ready')
+            time.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', default='1,2,4', help='comma separated worker counts')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--database', default=os.path.join(tempfile.gettempdir(), 'bench_workers.db'))
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--scenarios', default='get,list_department,create')
+    parser.add_argument('--output', help='write the JSON report to this file as well as stdout')
+    args = parser.parse_args()
+
+    from app import create_app
+    database_uri = f'sqlite:///{os.path.abspath(args.database)}'
+    seed(create_app({'SQLALCHEMY_DATABASE_URI': database_uri}), args.rows, random.Random(42))
+    env = {**os.environ, 'DATABASE_URL': database_uri}
+
+    results: List[Dict] = []
+    for workers in map(int, args.workers.split(',')):
+        with server(workers, env) as url:
+            output = subprocess.run([
+                sys.executable, BENCH_ENDPOINTS, '--url', url, '--database', args.database,
+                '--rows', str(args.rows), '--concurrency', str(args.concurrency),
+                '--requests', str(args.requests), '--scenarios', args.scenarios,
+            ], cwd=ROOT, env=env, check=True, capture_output=True, text=True).stdout
+        for result in json.loads(output)['results']:
+            results.append({'workers': workers, 'scenario': result['scenario'],
+                            'throughput_rps': result['throughput_rps'], 'p99_ms': result['p99_ms'],
+                            'errors': result['errors']})
+
+    report = {'rows': args.rows, 'concurrency': args.concurrency, 'cpus': os.cpu_count(), 'results': results}
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
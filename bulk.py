@@ -0,0 +1,184 @@
+import json
+import sqlalchemy.exc
+from datetime import datetime
+from sqlalchemy import delete, insert, or_, select, update
+from models import Employee, db
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DUPLICATE_MESSAGE = 'Employee should have a unique name and email.'
+# Fields a filter-based PATCH may set; name and email are unique per employee
+UPDATABLE_FIELDS = ('department', 'role')
+
+
+class RowError(ValueError):
+    """Raised when a single row of a bulk payload cannot be ingested."""
+
+
+def parse_ndjson(lines: Iterable[bytes]) -> Iterator[Any]:
+    """Yield one decoded record per non-blank NDJSON line.
+
+    Lines that are not valid JSON are yielded as ``RowError`` instances so
+    that they are reported against their row instead of failing the batch.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield RowError(f'Invalid JSON: {e}')
+
+
+def validate_row(raw: Any) -> Dict[str, Any]:
+    """Return the insertable column values of ``raw`` or raise ``RowError``."""
+    if isinstance(raw, RowError):
+        raise raw
+    if not isinstance(raw, dict):
+        raise RowError('Employee must be a JSON object.')
+    for field in ('name', 'email'):
+        value = raw.get(field)
+        if not isinstance(value, str) or not value.strip():
+            raise RowError(f"'{field}' is required.")
+    for field in ('department', 'role'):
+        value = raw.get(field)
+        if value is not None and not isinstance(value, str):
+            raise RowError(f"'{field}' must be a string.")
+    return {
+        'name': raw['name'],
+        'email': raw['email'],
+        'department': raw.get('department'),
+        'role': raw.get('role')
+    }
+
+
+def _created(index: int, employee_id: int) -> Dict[str, Any]:
+    return {'index': index, 'status': 'created', 'id': employee_id}
+
+
+def _failed(index: int, message: str) -> Dict[str, Any]:
+    return {'index': index, 'status': 'error', 'message': message}
+
+
+def _insert_one_by_one(pending: List[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Slow path used when a chunk races with a concurrent writer."""
+    results = []
+    stmt = insert(Employee.__table__).returning(Employee.id)
+    for index, row in pending:
+        try:
+            employee_id = db.session.execute(stmt, row).scalar_one()
+            db.session.commit()
+            results.append(_created(index, employee_id))
+        except sqlalchemy.exc.IntegrityError:
+            db.session.rollback()
+            results.append(_failed(index, DUPLICATE_MESSAGE))
+    return results
+
+
+def _insert_chunk(chunk: List[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Insert one chunk of validated rows in a single transaction.
+
+    Rows clashing with existing employees, or with earlier rows of the same
+    chunk, are reported as errors up front so the executemany never aborts.
+    A chunk costs three statements: the clash lookup, the executemany
+    INSERT and the id lookup.
+    """
+    results = []
+    names = {row['name'] for _, row in chunk}
+    emails = {row['email'] for _, row in chunk}
+    existing = db.session.execute(
+        select(Employee.name, Employee.email)
+        .where(or_(Employee.name.in_(names), Employee.email.in_(emails)))
+    ).all()
+    taken_names = {name for name, _ in existing}
+    taken_emails = {email for _, email in existing}
+
+    pending = []
+    for index, row in chunk:
+        if row['name'] in taken_names or row['email'] in taken_emails:
+            results.append(_failed(index, DUPLICATE_MESSAGE))
+            continue
+        taken_names.add(row['name'])
+        taken_emails.add(row['email'])
+        pending.append((index, row))
+
+    if not pending:
+        db.session.rollback()
+        return results
+
+    # No RETURNING: SQLAlchemy would fall back to one INSERT per row on
+    # SQLite. Emails are unique, so one SELECT maps the new rows to their ids.
+    try:
+        db.session.execute(insert(Employee.__table__), [row for _, row in pending])
+        ids = dict(db.session.execute(
+            select(Employee.email, Employee.id).where(Employee.email.in_([row['email'] for _, row in pending]))
+        ).all())
+        db.session.commit()
+    except sqlalchemy.exc.IntegrityError:
+        db.session.rollback()
+        return results + _insert_one_by_one(pending)
+
+    results.extend(_created(index, ids[row['email']]) for index, row in pending)
+    return results
+
+
+def ingest(rows: Iterable[Any], chunk_size: int) -> Dict[str, Any]:
+    """Validate and insert ``rows`` in transactions of ``chunk_size`` rows.
+
+    Returns a report with one entry per input row, in input order.
+    """
+    results: List[Dict[str, Any]] = []
+    chunk: List[Tuple[int, Dict[str, Any]]] = []
+    for index, raw in enumerate(rows):
+        try:
+            chunk.append((index, validate_row(raw)))
+        except RowError as e:
+            results.append(_failed(index, str(e)))
+        if len(chunk) >= chunk_size:
+            results.extend(_insert_chunk(chunk))
+            chunk = []
+    if chunk:
+        results.extend(_insert_chunk(chunk))
+
+    results.sort(key=lambda result: result['index'])
+    created = sum(1 for result in results if result['status'] == 'created')
+    return {
+        'created': created,
+        'failed': len(results) - created,
+        'results': results
+    }
+
+
+def validate_changes(raw: Any) -> Dict[str, Optional[str]]:
+    """Return the column values of a bulk PATCH body or raise ``RowError``."""
+    if not isinstance(raw, dict) or not raw:
+        raise RowError(f"Request body must be a JSON object with {' and/or '.join(UPDATABLE_FIELDS)}.")
+    unknown = sorted(set(raw) - set(UPDATABLE_FIELDS))
+    if unknown:
+        raise RowError(f"Cannot bulk update {', '.join(repr(field) for field in unknown)}.")
+    for field, value in raw.items():
+        if value is not None and not isinstance(value, str):
+            raise RowError(f"'{field}' must be a string.")
+    return dict(raw)
+
+
+def update_where(filters: list, changes: Dict[str, Optional[str]]) -> List[int]:
+    """Apply ``changes`` to every matching employee in one UPDATE; return their ids.
+
+    The statement bumps ``version`` itself (the mapper only does that for ORM
+    flushes), so ETags and If-Match checks see the change. The SQLite
+    triggers keep the change counter, headcounts and search index in step.
+    """
+    stmt = (update(Employee.__table__).where(*filters)
+            .values(**changes, version=Employee.version + 1, updated_at=datetime.utcnow())
+            .returning(Employee.id))
+    ids = db.session.execute(stmt).scalars().all()
+    db.session.commit()
+    return ids
+
+
+def delete_where(filters: list) -> List[int]:
+    """Delete every matching employee in one DELETE; return their ids."""
+    ids = db.session.execute(delete(Employee.__table__).where(*filters).returning(Employee.id)).scalars().all()
+    db.session.commit()
+    return ids
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class CacheBackend:
+    """Interface for the cache in front of single-employee lookups.
+
+    ``LRUCache`` is the in-process default. A shared backend (Redis,
+    memcached, ...) can be plugged in by subclassing this and setting the
+    ``EMPLOYEE_CACHE_BACKEND`` config value to an instance of it.
+    """
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """Store ``value``, unless ``key`` was deleted after ``generation`` was taken."""
+        raise NotImplementedError
+
+    def generation(self) -> int:
+        """A token to take before reading the value to ``set``, so that a
+        ``delete`` racing with the read keeps the stale value out."""
+        raise NotImplementedError
+
+    def delete(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+class LRUCache(CacheBackend):
+    """Thread-safe LRU cache with a size bound and a per-entry TTL."""
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        # Every delete bumps the generation and stamps its key with it. Only
+        # the ``maxsize`` most recent stamps are kept; keys whose stamp was
+        # dropped count as deleted at ``_dropped_generation``.
+        self._generation = 0
+        self._deleted: 'OrderedDict[Hashable, int]' = OrderedDict()
+        self._dropped_generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if generation is not None and self._deleted.get(key, self._dropped_generation) > generation:
+                return
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            if self.maxsize <= 0:
+                return
+            self._generation += 1
+            self._deleted[key] = self._generation
+            self._deleted.move_to_end(key)
+            if len(self._deleted) > self.maxsize:
+                _, self._dropped_generation = self._deleted.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._deleted.clear()
+            self._dropped_generation = self._generation
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+def from_config(config: Dict[str, Any], prefix: str = 'EMPLOYEE_CACHE') -> CacheBackend:
+    """The ``<prefix>_BACKEND`` instance, or an ``LRUCache`` sized by ``<prefix>_SIZE`` and ``<prefix>_TTL``."""
+    backend: Optional[CacheBackend] = config.get(f'{prefix}_BACKEND')
+    if backend is not None:
+        return backend
+    return LRUCache(config[f'{prefix}_SIZE'], config[f'{prefix}_TTL'])
@@ -0,0 +1,81 @@
+"""Change feed over the ``employee_changes`` log.
+
+Triggers write the log in the same transaction as every insert, update and
+delete, whichever path issued it (ORM, bulk Core statements, the async app).
+Each write replaces the employee's previous entry, so a client that last
+synced at ``since`` only receives the latest state of what changed after it.
+Tombstones are kept for ``CHANGE_LOG_RETENTION`` and then purged; a client
+whose ``since`` predates the purge has to resync from the full list.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, select, update
+from models import ChangeLogRetention, Employee, EmployeeChange, db
+import serializers
+from typing import Any, Dict, List, Tuple
+
+_purge_lock = threading.Lock()
+_next_purge = 0.0
+
+
+class ChangesPurged(Exception):
+    """Raised when tombstones a client still needs have been purged."""
+
+
+def purged_seq() -> int:
+    return db.session.scalar(select(ChangeLogRetention.purged_seq)
+                             .where(ChangeLogRetention.name == 'employees')) or 0
+
+
+def purge_tombstones(retention: timedelta) -> int:
+    """Delete tombstones older than ``retention`` and return how many went."""
+    cutoff = datetime.utcnow() - retention
+    seqs = db.session.execute(
+        delete(EmployeeChange)
+        .where(EmployeeChange.op == 'delete', EmployeeChange.changed_at < cutoff)
+        .returning(EmployeeChange.seq)
+    ).scalars().all()
+    if seqs:
+        db.session.execute(
+            update(ChangeLogRetention).where(ChangeLogRetention.name == 'employees')
+            .values(purged_seq=func.max(ChangeLogRetention.purged_seq, max(seqs)))
+        )
+    db.session.commit()
+    return len(seqs)
+
+
+def maybe_purge_tombstones(retention: timedelta, interval: float) -> None:
+    """Run ``purge_tombstones`` at most once per ``interval`` seconds per process."""
+    global _next_purge
+    now = time.monotonic()
+    with _purge_lock:
+        if now < _next_purge:
+            return
+        _next_purge = now + interval
+    purge_tombstones(retention)
+
+
+def feed(since: int, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+    """Return up to ``limit`` changes after ``since`` in ``seq`` order, and whether more exist.
+
+    Raises ``ChangesPurged`` when ``since`` is older than the purged
+    tombstones; ``since=0`` is a full snapshot and never needs them.
+    """
+    if 0 < since < purged_seq():
+        raise ChangesPurged()
+
+    rows = db.session.execute(
+        select(EmployeeChange.seq, EmployeeChange.op, EmployeeChange.employee_id, *serializers.EMPLOYEE_COLUMNS)
+        .outerjoin(Employee, Employee.id == EmployeeChange.employee_id)
+        .where(EmployeeChange.seq > since)
+        .order_by(EmployeeChange.seq)
+        .limit(limit + 1)
+    ).all()
+    changes = []
+    for row in rows[:limit]:
+        change: Dict[str, Any] = {'seq': row[0], 'op': row[1], 'id': row[2]}
+        if row[1] == 'upsert':
+            change['employee'] = serializers.employee_from_row(row[3:])
+        changes.append(change)
+    return changes, len(rows) > limit
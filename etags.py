@@ -0,0 +1,37 @@
+import hashlib
+from flask import Response
+from sqlalchemy import select
+from models import TableVersion, db
+from typing import Iterable, Optional, Tuple
+from werkzeug.datastructures import ETags
+
+
+def employee_etag(employee_id: int, version: int) -> str:
+    return f'employee-{employee_id}-v{version}'
+
+
+def employee_version(if_match: ETags, employee_id: int) -> Optional[int]:
+    """The version an ``If-Match`` header names for ``employee_id``, if any."""
+    prefix = f'employee-{employee_id}-v'
+    for tag in if_match.as_set():
+        if tag.startswith(prefix) and tag[len(prefix):].isdigit():
+            return int(tag[len(prefix):])
+    return None
+
+
+def list_etag(args: Iterable[Tuple[str, str]]) -> str:
+    """ETag of a list response: the employees change counter plus the query.
+
+    The counter is read before the rows, so a write racing with the request
+    can only make the tag older than the body, which costs the client one
+    extra download rather than a stale 304.
+    """
+    version = db.session.scalar(select(TableVersion.version).where(TableVersion.name == 'employees')) or 0
+    query = '&'.join(f'{key}={value}' for key, value in sorted(args))
+    return f'employees-v{version}-{hashlib.sha1(query.encode()).hexdigest()[:16]}'
+
+
+def not_modified(etag: str) -> tuple[Response, int]:
+    response = Response()
+    response.set_etag(etag)
+    return response, 304
@@ -0,0 +1,52 @@
+import csv
+import io
+import serializers
+from sqlalchemy import select
+from sqlalchemy.engine import Result
+from models import Employee, db
+from typing import Iterator, Optional
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def stream_rows(department: Optional[str], role: Optional[str], batch_size: int) -> Result:
+    """Run the export query and return a result that fetches ``batch_size`` rows at a time.
+
+    Only plain column tuples are loaded, so no ORM objects pile up in the
+    session identity map while the table is walked.
+    """
+    query = select(*serializers.EMPLOYEE_COLUMNS).order_by(Employee.id)
+    if department:
+        query = query.where(Employee.department == department)
+    if role:
+        query = query.where(Employee.role == role)
+    return db.session.execute(query.execution_options(yield_per=batch_size))
+
+
+def iter_ndjson(result: Result) -> Iterator[str]:
+    with result:
+        for batch in result.partitions():
+            yield ''.join(serializers.dumps(serializers.employee_from_row(row)) + '\n' for row in batch)
+
+
+def iter_csv(result: Result) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(serializers.EMPLOYEE_FIELDS)
+    # Send the header before the first batch is fetched
+    yield buffer.getvalue()
+    with result:
+        for batch in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(serializers.employee_values(row) for row in batch)
+            yield buffer.getvalue()
+
+
+FORMATTERS = {
+    'ndjson': iter_ndjson,
+    'csv': iter_csv,
+}
@@ -0,0 +1,162 @@
+"""Replay protection for retried ``POST`` requests carrying an ``Idempotency-Key``.
+
+The first request with a key runs normally and its response is stored;
+retries with the same key and request get the stored response back, while
+the same key with a different request, or while the first request is still
+running, is refused. Server errors are not stored, so they can be retried.
+
+By default keys live in the ``idempotency_keys`` table, so a retry is
+recognised whichever ``server.py`` worker it reaches, and completed
+responses are also kept in a per-process cache so replays on the same
+worker skip the database. With ``IDEMPOTENCY_CACHE_BACKEND`` set, keys live
+only in that (shared) ``cache.CacheBackend``.
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import Request, Response
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from cache import CacheBackend
+from models import IdempotencyKey, db
+from typing import Hashable, Optional, Tuple
+
+# (fingerprint, None) while the first request runs, then (fingerprint, (status, mimetype, body))
+Entry = Tuple[str, Optional[Tuple[int, str, bytes]]]
+
+
+class KeyReused(Exception):
+    """The key was already used for a request with a different body."""
+
+
+class InProgress(Exception):
+    """A request with the same key has not finished yet."""
+
+
+def fingerprint(request: Request) -> str:
+    # full_path includes the query string, so ?upsert=email is a different request
+    digest = hashlib.sha256(f'{request.method} {request.full_path}\n'.encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def replay(entry: Entry, request_fingerprint: str) -> Response:
+    """The stored response of ``entry``, or ``KeyReused``/``InProgress``."""
+    stored_fingerprint, stored = entry
+    if stored_fingerprint != request_fingerprint:
+        raise KeyReused()
+    if stored is None:
+        raise InProgress()
+    status, mimetype, body = stored
+    response = Response(body, status=status, mimetype=mimetype)
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+class IdempotencyStore:
+    """Keys stored in a ``CacheBackend`` only, for backends shared between processes."""
+
+    def __init__(self, backend: CacheBackend) -> None:
+        self.backend = backend
+        # Makes check-and-reserve atomic within this process
+        self._lock = threading.Lock()
+
+    def begin(self, key: Hashable, request_fingerprint: str) -> Optional[Response]:
+        """Reserve ``key``, or return the stored response of an earlier request with it."""
+        with self._lock:
+            entry: Optional[Entry] = self.backend.get(key)
+            if entry is None:
+                self.backend.set(key, (request_fingerprint, None))
+                return None
+        return replay(entry, request_fingerprint)
+
+    def complete(self, key: Hashable, request_fingerprint: str, response: Response, status: int) -> None:
+        """Store the outcome of the request that reserved ``key``; server errors release it instead."""
+        if status >= 500:
+            self.backend.delete(key)
+        else:
+            self.backend.set(key, (request_fingerprint, (status, response.mimetype, response.get_data())))
+
+    def release(self, key: Hashable) -> None:
+        self.backend.delete(key)
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """Keys reserved in the ``idempotency_keys`` table; ``backend`` caches completed entries.
+
+    ``key`` is an ``(identity, Idempotency-Key)`` pair. Reserving is a single
+    ``INSERT ... ON CONFLICT`` that only takes over an expired row, so two
+    workers can never both run a request for the same key. Expired rows are
+    purged at most once per ``purge_interval`` seconds per process.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float, purge_interval: float) -> None:
+        super().__init__(backend)
+        self.ttl = timedelta(seconds=ttl)
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+
+    @staticmethod
+    def _where(key: Tuple[str, str]) -> tuple:
+        identity, idempotency_key = key
+        return IdempotencyKey.identity == str(identity), IdempotencyKey.key == idempotency_key
+
+    def begin(self, key: Tuple[str, str], request_fingerprint: str) -> Optional[Response]:
+        entry: Optional[Entry] = self.backend.get(key)
+        if entry is not None:
+            return replay(entry, request_fingerprint)
+
+        self.maybe_purge()
+        now = datetime.utcnow()
+        identity, idempotency_key = key
+        stmt = sqlite_insert(IdempotencyKey).values(identity=str(identity), key=idempotency_key,
+                                                    fingerprint=request_fingerprint, expires_at=now + self.ttl)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.identity, IdempotencyKey.key],
+            set_={'fingerprint': stmt.excluded.fingerprint, 'status': None, 'mimetype': None, 'body': None,
+                  'expires_at': stmt.excluded.expires_at},
+            where=IdempotencyKey.expires_at <= now
+        )
+        reserved = db.session.execute(stmt).rowcount == 1
+        row = None
+        if not reserved:
+            row = db.session.execute(
+                select(IdempotencyKey.fingerprint, IdempotencyKey.status, IdempotencyKey.mimetype,
+                       IdempotencyKey.body).where(*self._where(key))
+            ).first()
+        db.session.commit()
+        if reserved:
+            return None
+        if row is None:
+            # Purged between the INSERT and the SELECT; the retry will reserve it
+            raise InProgress()
+
+        entry = (row.fingerprint, None if row.status is None else (row.status, row.mimetype, row.body))
+        if entry[1] is not None:
+            self.backend.set(key, entry)
+        return replay(entry, request_fingerprint)
+
+    def complete(self, key: Tuple[str, str], request_fingerprint: str, response: Response, status: int) -> None:
+        if status >= 500:
+            self.release(key)
+            return
+        stored = (status, response.mimetype, response.get_data())
+        db.session.execute(update(IdempotencyKey).where(*self._where(key))
+                           .values(status=stored[0], mimetype=stored[1], body=stored[2]))
+        db.session.commit()
+        self.backend.set(key, (request_fingerprint, stored))
+
+    def release(self, key: Tuple[str, str]) -> None:
+        db.session.rollback()
+        db.session.execute(delete(IdempotencyKey).where(*self._where(key)))
+        db.session.commit()
+        self.backend.delete(key)
+
+    def maybe_purge(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_purge:
+                return
+            self._next_purge = now + self.purge_interval
+        db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow()))
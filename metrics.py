@@ -0,0 +1,212 @@
+"""Per-request performance instrumentation exposed in Prometheus text format.
+
+``install`` hooks a Flask app and its SQLAlchemy engine so that every
+request records its latency, response size, SQL statement count, time spent
+in the database and time spent verifying the JWT. Handlers that stream their
+body (the export endpoint) are measured up to the point the response starts.
+"""
+import logging
+import threading
+from collections import defaultdict
+from time import perf_counter
+from flask import Flask, Response, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+SIZE_BUCKETS = (128, 1024, 8192, 65536, 524288, 4194304)
+# Statements kept per request for the slow-request log
+MAX_LOGGED_STATEMENTS = 50
+
+slow_log = logging.getLogger('habot.slow_requests')
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        with self._lock:
+            self._values[tuple(sorted(labels.items()))] += amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} counter'
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                yield f'{self.name}{_format_labels(labels)} {_format_value(value)}'
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # Per label set: [count per bucket..., +Inf count, sum]
+        self._values: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._values.get(tuple(sorted(labels.items())))
+        return int(series[-2]) if series else 0
+
+    def render(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} histogram'
+        with self._lock:
+            for labels, series in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = ('le', _format_value(bound))
+                    yield f'{self.name}_bucket{_format_labels(labels, le)} {_format_value(count)}'
+                yield f'{self.name}_bucket{_format_labels(labels, ("le", "+Inf"))} {_format_value(series[-2])}'
+                yield f'{self.name}_sum{_format_labels(labels)} {_format_value(series[-1])}'
+                yield f'{self.name}_count{_format_labels(labels)} {_format_value(series[-2])}'
+
+
+class Gauge:
+    """A gauge whose values are collected when the metrics are rendered."""
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.collectors = []
+
+    def render(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} gauge'
+        for collect in self.collectors:
+            for labels, value in collect():
+                yield f'{self.name}{_format_labels(tuple(sorted(labels.items())))} {_format_value(value)}'
+
+
+REQUESTS = Counter('http_requests_total', 'Requests handled, by endpoint, method and status.')
+LATENCY = Histogram('http_request_duration_seconds', 'Request handling time.', LATENCY_BUCKETS)
+RESPONSE_SIZE = Histogram('http_response_size_bytes', 'Response body size.', SIZE_BUCKETS)
+SQL_STATEMENTS = Histogram('http_request_sql_statements', 'SQL statements executed per request.',
+                           STATEMENT_BUCKETS)
+DB_TIME = Histogram('http_request_db_seconds', 'Time spent executing SQL per request.', LATENCY_BUCKETS)
+JWT_TIME = Histogram('jwt_verification_seconds', 'Time spent decoding and verifying the JWT.', LATENCY_BUCKETS)
+JWT_CLAIMS_CACHE = Counter('jwt_claims_cache_total', 'Verified-token cache lookups, by result.')
+CACHE = Gauge('employee_cache', 'Single-employee cache counters, by stat.')
+ADMISSION_QUEUE = Gauge('admission_queue_depth', 'Requests waiting for an admission slot, by route class.')
+ADMISSION_IN_FLIGHT = Gauge('admission_in_flight', 'Admitted requests being handled, by route class.')
+ADMISSION_WAIT = Histogram('admission_queue_wait_seconds', 'Time queued requests waited for a slot.',
+                           LATENCY_BUCKETS)
+ADMISSION_SHED = Counter('admission_shed_total', 'Requests rejected by admission control, by route class and reason.')
+
+REGISTRY = [REQUESTS, LATENCY, RESPONSE_SIZE, SQL_STATEMENTS, DB_TIME, JWT_TIME, JWT_CLAIMS_CACHE, CACHE,
+            ADMISSION_QUEUE, ADMISSION_IN_FLIGHT, ADMISSION_WAIT, ADMISSION_SHED]
+
+
+def render() -> str:
+    return '\n'.join(line for metric in REGISTRY for line in metric.render()) + '\n'
+
+
+class RequestStats:
+    __slots__ = ('started', 'statements', 'db_time', 'jwt_time', 'sql')
+
+    def __init__(self) -> None:
+        self.started = perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+        self.jwt_time = 0.0
+        self.sql: List[str] = []
+
+
+def current_stats() -> Optional[RequestStats]:
+    return g.get('request_stats') if has_app_context() else None
+
+
+def record_jwt_time(seconds: float) -> None:
+    JWT_TIME.observe(seconds)
+    stats = current_stats()
+    if stats is not None:
+        stats.jwt_time += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info['query_started'] = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = perf_counter() - conn.info['query_started']
+    stats = current_stats()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_time += elapsed
+        if len(stats.sql) < MAX_LOGGED_STATEMENTS:
+            stats.sql.append(f'[{elapsed * 1000:.2f} ms] {statement}')
+
+
+def _server_timing(stats: RequestStats, elapsed: float) -> str:
+    return ', '.join([
+        f'app;dur={elapsed * 1000:.2f}',
+        f'db;dur={stats.db_time * 1000:.2f};desc="{stats.statements} statements"',
+        f'jwt;dur={stats.jwt_time * 1000:.2f}',
+    ])
+
+
+def install(app: Flask, engine: Engine) -> None:
+    """Instrument ``app`` and the SQL executed through ``engine``."""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_request_stats() -> None:
+        g.request_stats = RequestStats()
+
+    @app.after_request
+    def record_request_stats(response: Response) -> Response:
+        stats: Optional[RequestStats] = g.pop('request_stats', None)
+        if stats is None:
+            return response
+        elapsed = perf_counter() - stats.started
+        # Label by view name, so series keep their names under the blueprint
+        endpoint = request.endpoint.rpartition('.')[2] if request.endpoint else 'unmatched'
+        REQUESTS.inc(endpoint=endpoint, method=request.method, status=str(response.status_code))
+        LATENCY.observe(elapsed, endpoint=endpoint, method=request.method)
+        SQL_STATEMENTS.observe(stats.statements, endpoint=endpoint)
+        DB_TIME.observe(stats.db_time, endpoint=endpoint)
+        if not response.is_streamed:
+            RESPONSE_SIZE.observe(response.calculate_content_length() or 0, endpoint=endpoint)
+
+        if app.config['SERVER_TIMING']:
+            response.headers['Server-Timing'] = _server_timing(stats, elapsed)
+        if elapsed >= app.config['SLOW_REQUEST_SECONDS']:
+            slow_log.warning('Slow request %s %s took %.1f ms (%d statements, %.1f ms in SQL)\n%s',
+                             request.method, request.full_path, elapsed * 1000, stats.statements,
+                             stats.db_time * 1000, '\n'.join(stats.sql))
+        return response
@@ -0,0 +1,194 @@
+"""Versioned schema migrations for databases created before a model change.
+
+``db.create_all()`` only creates missing tables, so anything added to an
+existing table (indexes, columns, triggers) needs a step here. Steps run in
+version order, once per database, and must be idempotent because a fresh
+database already gets the current schema from ``create_all``.
+"""
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from models import (ChangeLogRetention, Employee, EmployeeChange, EmployeeGroupCount, IdempotencyKey,
+                    SchemaMigration, TableVersion, db)
+from typing import Callable, List, Tuple
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = []
+
+
+def migration(version: int, description: str):
+    def register(step: Callable[[Connection], None]) -> Callable[[Connection], None]:
+        MIGRATIONS.append((version, description, step))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return step
+    return register
+
+
+@migration(1, 'Index employees on department and role filters')
+def add_filter_indexes(conn: Connection) -> None:
+    for index in Employee.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
+
+@migration(2, 'Track row versions and a table change counter for employees')
+def add_version_tracking(conn: Connection) -> None:
+    columns = {column['name'] for column in inspect(conn).get_columns('employees')}
+    if 'version' not in columns:
+        conn.execute(text('ALTER TABLE employees ADD COLUMN version INTEGER NOT NULL DEFAULT 1'))
+    if 'updated_at' not in columns:
+        conn.execute(text('ALTER TABLE employees ADD COLUMN updated_at DATETIME'))
+        conn.execute(text('UPDATE employees SET updated_at = date_joined'))
+
+    TableVersion.__table__.create(conn, checkfirst=True)
+    conn.execute(text("INSERT OR IGNORE INTO table_versions (name, version) VALUES ('employees', 0)"))
+    for event, suffix in (('INSERT', 'ai'), ('UPDATE', 'au'), ('DELETE', 'ad')):
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS employees_{suffix}_table_version AFTER {event} ON employees
+            BEGIN
+                UPDATE table_versions SET version = version + 1 WHERE name = 'employees';
+            END
+        """))
+
+
+@migration(3, 'Full-text search index over employees')
+def add_search_index(conn: Connection) -> None:
+    # External content table: the text lives only in employees, the triggers
+    # below keep the index in step with every write path.
+    conn.execute(text("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS employees_fts USING fts5(
+            name, email, department, role,
+            content='employees', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS employees_ai_fts AFTER INSERT ON employees
+        BEGIN
+            INSERT INTO employees_fts (rowid, name, email, department, role)
+            VALUES (new.id, new.name, new.email, new.department, new.role);
+        END
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS employees_ad_fts AFTER DELETE ON employees
+        BEGIN
+            INSERT INTO employees_fts (employees_fts, rowid, name, email, department, role)
+            VALUES ('delete', old.id, old.name, old.email, old.department, old.role);
+        END
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS employees_au_fts AFTER UPDATE OF name, email, department, role ON employees
+        BEGIN
+            INSERT INTO employees_fts (employees_fts, rowid, name, email, department, role)
+            VALUES ('delete', old.id, old.name, old.email, old.department, old.role);
+            INSERT INTO employees_fts (rowid, name, email, department, role)
+            VALUES (new.id, new.name, new.email, new.department, new.role);
+        END
+    """))
+    # Name matches outrank email matches, which outrank department/role ones
+    conn.execute(text("INSERT INTO employees_fts (employees_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 2.0, 2.0)')"))
+    conn.execute(text("INSERT INTO employees_fts (employees_fts) VALUES ('rebuild')"))
+
+
+@migration(4, 'Headcount summary by department and role')
+def add_group_counts(conn: Connection) -> None:
+    EmployeeGroupCount.__table__.create(conn, checkfirst=True)
+    increment = """
+        INSERT INTO employee_group_counts (department, role, headcount)
+        VALUES (coalesce(new.department, ''), coalesce(new.role, ''), 1)
+        ON CONFLICT (department, role) DO UPDATE SET headcount = headcount + 1;
+    """
+    decrement = """
+        UPDATE employee_group_counts SET headcount = headcount - 1
+        WHERE department = coalesce(old.department, '') AND role = coalesce(old.role, '');
+        DELETE FROM employee_group_counts
+        WHERE department = coalesce(old.department, '') AND role = coalesce(old.role, '') AND headcount <= 0;
+    """
+    conn.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS employees_ai_group_counts AFTER INSERT ON employees
+        BEGIN {increment} END
+    """))
+    conn.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS employees_ad_group_counts AFTER DELETE ON employees
+        BEGIN {decrement} END
+    """))
+    conn.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS employees_au_group_counts AFTER UPDATE OF department, role ON employees
+        WHEN old.department IS NOT new.department OR old.role IS NOT new.role
+        BEGIN {decrement} {increment} END
+    """))
+    conn.execute(text('DELETE FROM employee_group_counts'))
+    conn.execute(text("""
+        INSERT INTO employee_group_counts (department, role, headcount)
+        SELECT coalesce(department, ''), coalesce(role, ''), count(*) FROM employees GROUP BY 1, 2
+    """))
+
+
+@migration(5, 'Change feed for employees')
+def add_change_log(conn: Connection) -> None:
+    EmployeeChange.__table__.create(conn, checkfirst=True)
+    ChangeLogRetention.__table__.create(conn, checkfirst=True)
+    conn.execute(text("INSERT OR IGNORE INTO change_log_retention (name, purged_seq) VALUES ('employees', 0)"))
+    for event, suffix, row, op in (('INSERT', 'ai', 'new', 'upsert'), ('UPDATE', 'au', 'new', 'upsert'),
+                                   ('DELETE', 'ad', 'old', 'delete')):
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS employees_{suffix}_changes AFTER {event} ON employees
+            BEGIN
+                DELETE FROM employee_changes WHERE employee_id = {row}.id;
+                INSERT INTO employee_changes (employee_id, op, changed_at)
+                VALUES ({row}.id, '{op}', CURRENT_TIMESTAMP);
+            END
+        """))
+    # Existing employees enter the feed once, so ?since=0 is a full snapshot
+    conn.execute(text("""
+        INSERT INTO employee_changes (employee_id, op, changed_at)
+        SELECT id, 'upsert', CURRENT_TIMESTAMP FROM employees
+        WHERE id NOT IN (SELECT employee_id FROM employee_changes) ORDER BY id
+    """))
+
+
+@migration(6, 'Drop the department index covered by the department/role index')
+def drop_department_index(conn: Connection) -> None:
+    conn.execute(text('DROP INDEX IF EXISTS ix_employees_department'))
+
+
+@migration(7, 'Idempotency keys shared by all workers')
+def add_idempotency_keys(conn: Connection) -> None:
+    IdempotencyKey.__table__.create(conn, checkfirst=True)
+
+
+def init_schema(engine: Engine) -> List[int]:
+    """Create missing tables, then apply pending migrations (``flask init-db``)."""
+    with engine.begin() as conn:
+        return setup(conn)
+
+
+def setup(conn: Connection) -> List[int]:
+    """``init_schema`` inside an existing transaction, e.g. from ``AsyncConnection.run_sync``."""
+    db.metadata.create_all(conn)
+    return apply(conn)
+
+
+def upgrade(engine: Engine) -> List[int]:
+    """Apply every pending migration and return the versions that ran."""
+    with engine.begin() as conn:
+        return apply(conn)
+
+
+def pending(conn: Connection) -> List[int]:
+    """Versions that ``apply`` would run; all of them before the schema exists."""
+    if not inspect(conn).has_table(SchemaMigration.__tablename__):
+        return [version for version, _, _ in MIGRATIONS]
+    applied = set(conn.scalars(select(SchemaMigration.version)))
+    return [version for version, _, _ in MIGRATIONS if version not in applied]
+
+
+def apply(conn: Connection) -> List[int]:
+    """``upgrade`` inside an existing transaction, e.g. from ``AsyncConnection.run_sync``."""
+    ran = []
+    SchemaMigration.__table__.create(conn, checkfirst=True)
+    applied = set(conn.scalars(select(SchemaMigration.version)))
+    for version, description, step in MIGRATIONS:
+        if version in applied:
+            continue
+        step(conn)
+        conn.execute(SchemaMigration.__table__.insert().values(version=version, description=description))
+        ran.append(version)
+    return ran
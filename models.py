@@ -1,13 +1,19 @@
 from flask_sqlalchemy import SQLAlchemy
-from app import app_instance
 from datetime import datetime
 from typing import Optional
 
-db = SQLAlchemy(app_instance)
+db = SQLAlchemy()
 
 
 class Employee(db.Model):
     __tablename__ = 'employees'
+    # ``id`` is the rowid, which SQLite appends to every index, so each of
+    # these also serves ``ORDER BY id`` / ``id > ?`` after the equality match.
+    # A department-only filter uses the leading column of the composite index.
+    __table_args__ = (
+        db.Index('ix_employees_role', 'role'),
+        db.Index('ix_employees_department_role_id', 'department', 'role', 'id'),
+    )
 
     id: int = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name: str = db.Column(db.String(100), nullable=False, unique=True)
@@ -15,17 +21,95 @@ class Employee(db.Model):
     department: Optional[str] = db.Column(db.String(100), nullable=True)
     role: Optional[str] = db.Column(db.String(100), nullable=True)
     date_joined: datetime = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped on every ORM update/delete, which also checks it in the WHERE
+    # clause, so concurrent writers cannot silently overwrite each other.
+    version: int = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at: Optional[datetime] = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __mapper_args__ = {'version_id_col': version}
 
     def __repr__(self) -> str:
         return f"<Employee(name={self.name}, email={self.email})>"
 
     def to_dict(self) -> dict:
-        """Convert the Employee instance to a dictionary."""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "email": self.email,
-            "department": self.department,
-            "role": self.role,
-            "date_joined": self.date_joined.isoformat()  # Format date as ISO string
-        }
\ No newline at end of file
+        """Convert the Employee instance to its API dictionary (see ``serializers``)."""
+        from serializers import employee_to_dict
+        return employee_to_dict(self)
+
+
+class SchemaMigration(db.Model):
+    """A migration from ``migrations.py`` that has been applied to this database."""
+    __tablename__ = 'schema_migrations'
+
+    version: int = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    description: str = db.Column(db.String(200), nullable=False)
+    applied_at: datetime = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class TableVersion(db.Model):
+    """Change counter per table, bumped by SQLite triggers on every write."""
+    __tablename__ = 'table_versions'
+
+    name: str = db.Column(db.String(100), primary_key=True)
+    version: int = db.Column(db.Integer, nullable=False, default=0)
+
+
+class EmployeeGroupCount(db.Model):
+    """Headcount per (department, role), kept current by SQLite triggers.
+
+    A missing department or role is stored as ``''`` so that every group has
+    exactly one row (NULLs never collide in a primary key).
+    """
+    __tablename__ = 'employee_group_counts'
+
+    department: str = db.Column(db.String(100), primary_key=True)
+    role: str = db.Column(db.String(100), primary_key=True)
+    headcount: int = db.Column(db.Integer, nullable=False, default=0)
+
+
+class EmployeeChange(db.Model):
+    """One entry of the employee change feed, appended by SQLite triggers.
+
+    Each write replaces the previous entry for the same employee, so the log
+    holds at most one entry (the latest upsert or tombstone) per employee.
+    ``seq`` is AUTOINCREMENT so a sequence number is never handed out twice.
+    """
+    __tablename__ = 'employee_changes'
+    __table_args__ = (
+        db.Index('ix_employee_changes_employee_id', 'employee_id'),
+        {'sqlite_autoincrement': True},
+    )
+
+    seq: int = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    employee_id: int = db.Column(db.Integer, nullable=False)
+    # 'upsert' or 'delete'
+    op: str = db.Column(db.String(10), nullable=False)
+    changed_at: datetime = db.Column(db.DateTime, nullable=False, server_default=db.func.current_timestamp())
+
+
+class IdempotencyKey(db.Model):
+    """A ``POST`` sent with an ``Idempotency-Key``, shared by every worker (see ``idempotency.py``).
+
+    ``status``, ``mimetype`` and ``body`` stay NULL while the first request
+    with the key is still running.
+    """
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        db.Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+
+    identity: str = db.Column(db.String(255), primary_key=True)
+    key: str = db.Column(db.String(255), primary_key=True)
+    fingerprint: str = db.Column(db.String(64), nullable=False)
+    status: Optional[int] = db.Column(db.Integer, nullable=True)
+    mimetype: Optional[str] = db.Column(db.String(100), nullable=True)
+    body: Optional[bytes] = db.Column(db.LargeBinary, nullable=True)
+    expires_at: datetime = db.Column(db.DateTime, nullable=False)
+
+
+class ChangeLogRetention(db.Model):
+    """Highest ``seq`` whose tombstones may have been purged from a change log."""
+    __tablename__ = 'change_log_retention'
+
+    name: str = db.Column(db.String(100), primary_key=True)
+    purged_seq: int = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,81 @@
+import base64
+import binascii
+import json
+from sqlalchemy import Select, tuple_
+from models import Employee
+from typing import Any, Dict, Optional, Tuple
+
+# Columns the cursor mode of GET /api/employees can order by. They are all
+# NOT NULL, so a (column, id) seek never has to special-case NULLs.
+SORTABLE_COLUMNS = {
+    'id': Employee.id,
+    'name': Employee.name,
+    'email': Employee.email,
+}
+
+# JSON types ``encode_key`` emits for a sort value
+KEY_TYPES = (str, int, float, type(None))
+
+
+class CursorError(ValueError):
+    """Raised for an unknown sort column or a cursor that cannot be decoded."""
+
+
+def parse_sort(sort: str) -> Tuple[str, bool]:
+    """Split ``sort`` (e.g. ``name`` or ``-name``) into column name and direction."""
+    descending = sort.startswith('-')
+    column = sort.lstrip('-')
+    if column not in SORTABLE_COLUMNS:
+        raise CursorError(f"Cannot sort by '{column}'.")
+    return column, descending
+
+
+def encode_key(sort: str, value: Any, last_id: int) -> str:
+    """Encode an opaque cursor for the ``(value, id)`` position under ``sort``."""
+    payload = {'s': sort, 'k': [value, last_id]}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+def encode_cursor(sort: str, row) -> str:
+    """Encode the position of ``row`` (an ``Employee`` or a row with its columns)."""
+    column, _ = parse_sort(sort)
+    return encode_key(sort, getattr(row, column), row.id)
+
+
+def decode_cursor(cursor: str, sort: str, value_types: Tuple[type, ...] = KEY_TYPES) -> Tuple[Any, int]:
+    """Return the ``(sort value, id)`` key stored in ``cursor``.
+
+    The sort value must be one of ``value_types``, so a crafted cursor can
+    never bind a list or object as a query parameter.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload: Dict[str, Any] = json.loads(base64.urlsafe_b64decode(padded))
+        value, last_id = payload['k']
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise CursorError('Invalid cursor.')
+    if payload.get('s') != sort or not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise CursorError('Cursor does not match the requested sort.')
+    if not isinstance(value, value_types) or isinstance(value, bool):
+        raise CursorError('Invalid cursor.')
+    return value, last_id
+
+
+def seek(query: Select, sort: str, after: Optional[str]) -> Select:
+    """Order ``query`` by ``sort`` and skip past ``after`` with an index seek."""
+    column_name, descending = parse_sort(sort)
+    column = SORTABLE_COLUMNS[column_name]
+    if column_name == 'id':
+        key, tie_breaker = column, None
+    else:
+        key, tie_breaker = tuple_(column, Employee.id), Employee.id
+
+    if after is not None:
+        value, last_id = decode_cursor(after, sort)
+        bound = last_id if tie_breaker is None else tuple_(value, last_id)
+        query = query.where(key < bound if descending else key > bound)
+
+    order = [column.desc() if descending else column.asc()]
+    if tie_breaker is not None:
+        order.append(tie_breaker.desc() if descending else tie_breaker.asc())
+    return query.order_by(*order)
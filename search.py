@@ -0,0 +1,89 @@
+"""Ranked prefix search over the ``employees_fts`` FTS5 index (see migrations).
+
+Ranking has to score every match (bm25 also walks all of them for its term
+statistics), so only queries with at most ``max_ranked`` matches are
+ranked. Broader queries are paged in id order, which FTS5 streams without
+scoring and stops reading once the page is full.
+"""
+import re
+from sqlalchemy import Float, text
+from models import db
+import pagination
+import serializers
+from typing import Any, Dict, List, Optional, Tuple
+
+SORT = 'rank'
+# Cursor sort of broad queries, which are returned in id order
+UNRANKED_SORT = 'id'
+# Every run of letters/digits in the query becomes one prefix term
+TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def build_match(q: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: each word is a quoted prefix, all must match.
+
+    Quoting means user input can never inject FTS5 syntax (``OR``, ``NEAR``,
+    column filters, unbalanced quotes).
+    """
+    terms = TERM.findall(q)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _select(conditions: List[str], params: Dict[str, Any], rank: str, order: str) -> List[Any]:
+    return db.session.execute(text(f"""
+        SELECT e.id, e.name, e.email, e.department, e.role, e.date_joined, {rank} AS rank
+        FROM employees_fts AS f JOIN employees AS e ON e.id = f.rowid
+        WHERE {' AND '.join(conditions)}
+        ORDER BY {order}
+        LIMIT :limit
+    """).columns(*serializers.EMPLOYEE_COLUMNS, rank=Float), params).all()
+
+
+def search(match: str, department: Optional[str], role: Optional[str], limit: int, after: Optional[str],
+           max_ranked: int) -> Tuple[List[Any], Optional[str], bool]:
+    """Return one page of ``EMPLOYEE_COLUMNS`` + rank rows, the next cursor and whether the page is ranked.
+
+    A ranked page is ordered best match first. The first page decides: it
+    reads up to ``max_ranked + 1`` matches in id order, and when that is all
+    of them ranks them instead. The cursor keeps that choice for later pages.
+    """
+    conditions = ['employees_fts MATCH :match']
+    params: Dict[str, Any] = {'match': match, 'limit': limit + 1}
+    if department:
+        conditions.append('e.department = :department')
+        params['department'] = department
+    if role:
+        conditions.append('e.role = :role')
+        params['role'] = role
+
+    ranked = True
+    if after is None:
+        rows = _select(conditions, {**params, 'limit': max_ranked + 1}, 'NULL', 'f.rowid')
+        ranked = len(rows) <= max_ranked
+        if not ranked:
+            rows = rows[:limit + 1]
+    else:
+        try:
+            params['rank'], params['last_id'] = pagination.decode_cursor(after, SORT, (int, float))
+        except pagination.CursorError:
+            _, params['last_id'] = pagination.decode_cursor(after, UNRANKED_SORT, (int,))
+            ranked = False
+
+    if ranked:
+        if after is not None:
+            conditions.append('(f.rank > :rank OR (f.rank = :rank AND f.rowid > :last_id))')
+        rows = _select(conditions, params, 'f.rank', 'f.rank, f.rowid')
+    elif after is not None:
+        conditions.append('f.rowid > :last_id')
+        rows = _select(conditions, params, 'NULL', 'f.rowid')
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if ranked:
+            next_cursor = pagination.encode_key(SORT, rows[-1].rank, rows[-1].id)
+        else:
+            next_cursor = pagination.encode_key(UNRANKED_SORT, rows[-1].id, rows[-1].id)
+    return rows, next_cursor, ranked
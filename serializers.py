@@ -0,0 +1,75 @@
+"""The one mapping from employees to their JSON representation.
+
+List, detail and export responses all serialize from plain column tuples
+selected with ``EMPLOYEE_COLUMNS``, so hot paths never have to hydrate ORM
+objects or go through the session identity map just to read six columns.
+"""
+import json
+from flask.json.provider import DefaultJSONProvider
+from models import Employee
+from typing import Any, Dict, Sequence
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None
+
+EMPLOYEE_FIELDS = ('id', 'name', 'email', 'department', 'role', 'joining_date')
+EMPLOYEE_COLUMNS = (Employee.id, Employee.name, Employee.email, Employee.department,
+                    Employee.role, Employee.date_joined)
+
+
+def employee_values(row: Sequence[Any]) -> tuple:
+    """Return the JSON-ready values of an ``EMPLOYEE_COLUMNS`` row, in ``EMPLOYEE_FIELDS`` order."""
+    date_joined = row[5]
+    return (row[0], row[1], row[2], row[3], row[4], date_joined.isoformat() if date_joined else None)
+
+
+def employee_from_row(row: Sequence[Any]) -> Dict[str, Any]:
+    return dict(zip(EMPLOYEE_FIELDS, employee_values(row)))
+
+
+def employee_to_dict(employee: Employee) -> Dict[str, Any]:
+    return employee_from_row((employee.id, employee.name, employee.email, employee.department,
+                              employee.role, employee.date_joined))
+
+
+if orjson is not None:
+    class JSONProvider(DefaultJSONProvider):
+        """Flask JSON provider backed by orjson, used when it is installed.
+
+        Output matches the default provider apart from non-ASCII text being
+        sent as UTF-8 instead of escapes: keys are sorted and dates still go
+        through ``default`` so they keep Flask's HTTP-date format.
+        """
+        options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+        def dumps(self, obj: Any, **kwargs: Any) -> str:
+            return orjson.dumps(obj, default=self.default, option=self.options).decode()
+
+        def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+            return orjson.loads(s)
+
+        def response(self, *args: Any, **kwargs: Any):
+            if self.compact is False or (self.compact is None and self._app.debug):
+                return super().response(*args, **kwargs)
+            if args and kwargs:
+                raise TypeError('jsonify() behavior undefined when passed both args and kwargs')
+            obj = args[0] if len(args) == 1 else args or kwargs
+            body = orjson.dumps(obj, default=self.default, option=self.options | orjson.OPT_APPEND_NEWLINE)
+            return self._app.response_class(body, mimetype=self.mimetype)
+else:  # pragma: no cover
+    JSONProvider = DefaultJSONProvider
+
+
+def dumps(obj: Any) -> str:
+    """Compact JSON text of ``obj`` with the fastest available encoder."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
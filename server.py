@@ -0,0 +1,257 @@
+"""Pre-forking production server for the Flask app.
+
+The master process binds the listening socket, forks ``--workers`` worker
+processes and supervises them. Each worker builds its own app, engine and
+connection pool after the fork and serves one request at a time from the
+shared socket, so throughput scales with the number of cores. Create the
+schema first, then run it from the repository root, e.g.:
+
+    flask --app app init-db
+    python server.py --bind 0.0.0.0:8000 --workers 4 --max-requests 10000
+
+Signals to the master:
+
+- ``SIGHUP`` starts a new set of workers and gracefully retires the old
+  ones, picking up code and config changes (unless ``--preload`` is used).
+- ``SIGTERM``/``SIGINT`` stop accepting connections, let in-flight
+  requests finish for up to ``--graceful-timeout`` seconds and exit.
+
+A worker exits after serving ``--max-requests`` requests (plus up to
+``--max-requests-jitter``, so workers do not restart together) and is
+replaced. With more than one worker the employee cache is turned off unless
+``EMPLOYEE_CACHE_BACKEND`` is set: a per-worker cache is not invalidated by
+writes that other workers handle, so it would serve stale employees and
+ETags. ``/metrics`` is per worker; idempotency keys are kept in the
+database. POSIX only.
+"""
+import argparse
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import time
+import traceback
+from flask import Flask
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+from typing import Any, Dict, Optional, Tuple
+
+log = logging.getLogger('habot.server')
+
+
+class RequestHandler(WSGIRequestHandler):
+    # One request per connection: a worker serves one client at a time, so
+    # an idle kept-alive connection would block it.
+    protocol_version = 'HTTP/1.0'
+
+    def log_request(self, code='-', size='-') -> None:
+        if self.server.access_log:
+            super().log_request(code, size)
+
+
+class WorkerServer(BaseWSGIServer):
+    """Serves a Flask app from a listening socket inherited from the master."""
+    multiprocess = True
+
+    def __init__(self, listener: socket.socket, app: Flask, access_log: bool) -> None:
+        host, port = listener.getsockname()[:2]
+        super().__init__(host, port, app, handler=RequestHandler, fd=listener.fileno())
+        # Every worker is woken for each connection; the ones that lose the
+        # race for accept() must go back to waiting rather than block in it
+        self.socket.setblocking(False)
+        self.access_log = access_log
+        self.served = 0
+
+    def process_request(self, request, client_address) -> None:
+        self.served += 1
+        super().process_request(request, client_address)
+
+
+def parse_bind(bind: str) -> Tuple[str, int]:
+    host, _, port = bind.rpartition(':')
+    return host.strip('[]') or '127.0.0.1', int(port)
+
+
+def listen(bind: str, backlog: int = 2048) -> socket.socket:
+    host, port = parse_bind(bind)
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    listener = socket.socket(family, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(backlog)
+    return listener
+
+
+def app_config(workers: int) -> Dict[str, Any]:
+    """``create_app`` overrides for a server running ``workers`` processes.
+
+    The in-process employee cache is turned off with more than one worker;
+    a configured ``EMPLOYEE_CACHE_BACKEND`` is shared and still used.
+    """
+    return {'EMPLOYEE_CACHE_SIZE': 0} if workers > 1 else {}
+
+
+def load_app(preloaded: Optional[Flask], config: Dict[str, Any]) -> Flask:
+    """The worker's app: its own ``create_app(config)``, or the master's with its pool discarded."""
+    if preloaded is None:
+        from app import create_app
+        return create_app(config)
+    from models import db
+    with preloaded.app_context():
+        # SQLite connections must not be shared across fork; drop (without
+        # closing) anything the master's pool holds so this worker opens its own
+        db.engine.dispose(close=False)
+    return preloaded
+
+
+def run_worker(listener: socket.socket, preloaded: Optional[Flask], config: Dict[str, Any], max_requests: int,
+               access_log: bool) -> None:
+    """Serve requests until SIGTERM or ``max_requests`` (0 for no limit)."""
+    running = True
+
+    def stop(signum, frame) -> None:
+        nonlocal running
+        running = False
+
+    signal.signal(signal.SIGTERM, stop)
+    # Ctrl-C and terminal hangups reach the whole process group; leave them to the master
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    server = WorkerServer(listener, load_app(preloaded, config), access_log)
+    server.timeout = 0.5
+    try:
+        while running and not (max_requests and server.served >= max_requests):
+            server.handle_request()
+    finally:
+        server.server_close()
+    if running:
+        log.info('Worker %d recycled after %d requests', os.getpid(), server.served)
+
+
+class Master:
+    def __init__(self, listener: socket.socket, workers: int, max_requests: int = 0, max_requests_jitter: int = 0,
+                 graceful_timeout: float = 30, preload: bool = False, access_log: bool = False) -> None:
+        self.listener = listener
+        self.worker_count = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.access_log = access_log
+        self.config = app_config(workers)
+        self.app: Optional[Flask] = None
+        if preload:
+            from app import create_app
+            self.app = create_app(self.config)
+        # pid -> generation; SIGHUP starts a new generation and retires the old one
+        self.workers: Dict[int, int] = {}
+        self.generation = 0
+        self.reload_requested = False
+        self.stop_requested = False
+        self.respawn_after = 0.0
+
+    def spawn(self) -> None:
+        # Drawn here, not in the child, which would inherit the same random state
+        max_requests = self.max_requests and self.max_requests + random.randint(0, self.max_requests_jitter)
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                run_worker(self.listener, self.app, self.config, max_requests, self.access_log)
+            except BaseException:
+                traceback.print_exc()
+                status = 1
+            finally:
+                logging.shutdown()
+                os._exit(status)
+        self.workers[pid] = self.generation
+
+    def reap(self) -> None:
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.workers.pop(pid, None)
+            if os.waitstatus_to_exitcode(status) != 0 and not self.stop_requested:
+                log.warning('Worker %d exited with status %d', pid, os.waitstatus_to_exitcode(status))
+                # Back off so a worker that cannot boot does not fork in a tight loop
+                self.respawn_after = time.monotonic() + 1
+
+    def kill(self, pids, signum: int) -> None:
+        for pid in pids:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def reload(self) -> None:
+        self.reload_requested = False
+        log.info('Reloading: starting %d new workers', self.worker_count)
+        old = list(self.workers)
+        self.generation += 1
+        for _ in range(self.worker_count):
+            self.spawn()
+        self.kill(old, signal.SIGTERM)
+
+    def run(self) -> None:
+        def request_stop(signum, frame) -> None:
+            self.stop_requested = True
+
+        def request_reload(signum, frame) -> None:
+            self.reload_requested = True
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGHUP, request_reload)
+        host, port = self.listener.getsockname()[:2]
+        log.info('Listening on %s:%d with %d workers (pid %d)', host, port, self.worker_count, os.getpid())
+
+        while not self.stop_requested:
+            self.reap()
+            if self.reload_requested:
+                self.reload()
+            current = sum(1 for generation in self.workers.values() if generation == self.generation)
+            if current < self.worker_count and time.monotonic() >= self.respawn_after:
+                for _ in range(self.worker_count - current):
+                    self.spawn()
+            time.sleep(0.1)
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        log.info('Shutting down: waiting up to %ss for %d workers', self.graceful_timeout, len(self.workers))
+        self.kill(list(self.workers), signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.05)
+        self.kill(list(self.workers), signal.SIGKILL)
+        for pid in list(self.workers):
+            os.waitpid(pid, 0)
+        self.workers.clear()
+        self.listener.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bind', default='127.0.0.1:8000', help='host:port to listen on')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--max-requests', type=int, default=0, help='recycle a worker after this many requests')
+    parser.add_argument('--max-requests-jitter', type=int, default=0)
+    parser.add_argument('--graceful-timeout', type=float, default=30,
+                        help='seconds in-flight requests get to finish on shutdown')
+    parser.add_argument('--preload', action='store_true',
+                        help='build the app once in the master; faster forks, but SIGHUP keeps the old code')
+    parser.add_argument('--access-log', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(process)d] %(message)s', stream=sys.stderr)
+    Master(listen(args.bind), args.workers, args.max_requests, args.max_requests_jitter,
+           args.graceful_timeout, args.preload, args.access_log).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import threading
+import pytest
+from admission import Limiter, Rejected, TokenBuckets
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    buckets = TokenBuckets(rate=2, burst=3, clock=clock)
+
+    assert [buckets.take('alice') for _ in range(3)] == [0, 0, 0]
+    assert buckets.take('alice') == pytest.approx(0.5)
+    assert buckets.take('bob') == 0  # buckets are per identity
+
+    clock.now = 0.5
+    assert buckets.take('alice') == 0
+    assert buckets.take('alice') > 0
+
+
+def test_least_recently_seen_identity_is_evicted():
+    buckets = TokenBuckets(rate=1, burst=1, max_identities=2, clock=FakeClock())
+    buckets.take('alice')
+    buckets.take('bob')
+    buckets.take('carol')
+
+    assert buckets.take('bob') > 0
+    assert buckets.take('alice') == 0  # forgotten, so back to a full bucket
+
+
+def test_limiter_sheds_when_queue_is_full():
+    limiter = Limiter('write', limit=1, queue_size=0, timeout=1, retry_after=3)
+    limiter.acquire()
+
+    with pytest.raises(Rejected) as excinfo:
+        limiter.acquire()
+    assert excinfo.value.status == 503
+    assert excinfo.value.retry_after == 3
+
+    limiter.release()
+    limiter.acquire()
+    assert limiter.active == 1
+
+
+def test_limiter_sheds_after_queue_timeout():
+    limiter = Limiter('write', limit=1, queue_size=5, timeout=0.05, retry_after=1)
+    limiter.acquire()
+
+    with pytest.raises(Rejected):
+        limiter.acquire()
+    assert limiter.waiting == 0
+
+
+def test_queued_request_is_admitted_on_release():
+    limiter = Limiter('write', limit=1, queue_size=5, timeout=5, retry_after=1)
+    limiter.acquire()
+    admitted = threading.Event()
+
+    def queued():
+        limiter.acquire()
+        admitted.set()
+
+    thread = threading.Thread(target=queued)
+    thread.start()
+    assert not admitted.wait(0.05)
+    assert limiter.waiting == 1
+
+    limiter.release()
+    thread.join(timeout=5)
+    assert admitted.is_set()
+    assert limiter.active == 1 and limiter.waiting == 0
@@ -0,0 +1,224 @@
+import asyncio
+import json
+import pytest
+
+pytest.importorskip('aiosqlite')
+
+from app import create_app
+from models import Employee
+from flask_jwt_extended import create_access_token
+import asgi
+
+
+class ASGIClient:
+    """Minimal HTTP client that calls an ASGI app on one event loop."""
+
+    def __init__(self, app, loop):
+        self.app = app
+        self.loop = loop
+
+    def request(self, method, path, json_body=None, headers=None):
+        path, _, query = path.partition('?')
+        body = json.dumps(json_body).encode() if json_body is not None else b''
+        scope = {
+            'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(),
+            'headers': [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()],
+        }
+        messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        self.loop.run_until_complete(self.app(scope, receive, send))
+        return sent[0]['status'], json.loads(sent[1]['body'])
+
+    def get(self, path, headers=None):
+        return self.request('GET', path, headers=headers)
+
+    def post(self, path, headers=None, json=None):
+        return self.request('POST', path, json, headers)
+
+    def put(self, path, headers=None, json=None):
+        return self.request('PUT', path, json, headers)
+
+    def delete(self, path, headers=None):
+        return self.request('DELETE', path, headers=headers)
+
+
+@pytest.fixture
+def async_app(tmp_path):
+    config = {'USERNAME': 'testuser', 'PASSWORD': 'testpass',
+              'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/async.db'}
+    loop = asyncio.new_event_loop()
+    app = asgi.AsyncApp(config)
+    loop.run_until_complete(app.init_schema())
+    loop.run_until_complete(app.startup())
+    yield app, loop
+    loop.run_until_complete(app.shutdown())
+    loop.close()
+
+
+@pytest.fixture
+def client(async_app):
+    return ASGIClient(*async_app)
+
+
+@pytest.fixture
+def headers():
+    # Tokens issued by the Flask app are accepted by the async app
+    with create_app().app_context():
+        return {'Authorization': f"Bearer {create_access_token(identity='testuser')}"}
+
+
+@pytest.fixture
+def setup_employees(async_app):
+    app, loop = async_app
+
+    async def seed():
+        async with app.session() as session:
+            session.add_all([
+                Employee(name='John Doe', email='john.doe@example.com', department='Engineering', role='Developer'),
+                Employee(name='Jane Smith', email='jane.smith@example.com', department='Engineering', role='Developer'),
+                Employee(name='Alice Johnson', email='alice.johnson@example.com', department='HR', role='Manager'),
+                Employee(name='Bob Brown', email='bob.brown@example.com', department='HR', role='Manager'),
+            ])
+            await session.commit()
+
+    loop.run_until_complete(seed())
+
+
+def test_login(client):
+    status, data = client.post('/login', json={'username': 'testuser', 'password': 'testpass'})
+    assert status == 200
+    assert client.get('/api/employees', headers={'Authorization': f"Bearer {data['access_token']}"})[0] == 200
+
+    for credentials in ({'username': 'wronguser', 'password': 'testpass'},
+                        {'username': 'testuser', 'password': 'wrongpass'},
+                        {'password': 'testpass'}, {'username': 'testuser'}):
+        status, data = client.post('/login', json=credentials)
+        assert status == 401
+        assert data['message'] == 'Invalid username or password'
+
+
+def test_requires_token(client):
+    status, data = client.get('/api/employees')
+    assert status == 401
+    assert data['msg'] == 'Missing Authorization Header'
+
+    status, _ = client.get('/api/employees', headers={'Authorization': 'Bearer not.a.token'})
+    assert status == 422
+
+
+def test_create_employee(client, headers):
+    status, data = client.post('/api/employees', headers=headers, json={
+        'name': 'John Doe', 'email': 'john.doe@example.com', 'department': 'Engineering', 'role': 'Developer'
+    })
+    assert status == 201
+    assert data['message'] == 'Employee created successfully!'
+
+    # Duplicate name, then duplicate email
+    for duplicate in ({'name': 'John Doe', 'email': 'john.doe2@example.com'},
+                      {'name': 'Johnny Doe', 'email': 'john.doe@example.com'}):
+        status, data = client.post('/api/employees', headers=headers, json=duplicate)
+        assert status == 400
+        assert data['message'] == "Employee should have a unique name and email."
+
+    status, data = client.post('/api/employees', headers=headers, json={'name': 'Charlie Brown'})
+    assert status == 400
+    assert 'message' in data
+
+
+def test_get_employees(client, headers, setup_employees):
+    status, data = client.get('/api/employees', headers=headers)
+    assert status == 200
+    assert data['total'] == 4
+    assert len(data['employees']) == 4
+
+    status, data = client.get('/api/employees?department=Engineering', headers=headers)
+    assert data['total'] == 2
+    assert all(emp['department'] == 'Engineering' for emp in data['employees'])
+
+    status, data = client.get('/api/employees?role=Manager', headers=headers)
+    assert data['total'] == 2
+    assert all(emp['role'] == 'Manager' for emp in data['employees'])
+
+    status, data = client.get('/api/employees?page=2', headers=headers)
+    assert data['current_page'] == 2
+    assert len(data['employees']) == 0
+
+    status, data = client.get('/api/employees?department=NonExistent', headers=headers)
+    assert data['total'] == 0
+
+
+def test_get_employees_cursor(client, headers, setup_employees):
+    status, data = client.get('/api/employees?limit=3', headers=headers)
+    assert status == 200
+    assert [emp['id'] for emp in data['employees']] == [1, 2, 3]
+
+    status, data = client.get(f"/api/employees?limit=3&after={data['next_cursor']}", headers=headers)
+    assert [emp['id'] for emp in data['employees']] == [4]
+    assert data['next_cursor'] is None
+
+
+@pytest.mark.parametrize('query_string', [
+    'after=', 'department=', 'role=&department=HR', 'limit=', 'limit=2&after=', 'page=', 'sort=&limit=2',
+    'limit=2&after=not-a-cursor', 'department=HR&department=Engineering',
+])
+def test_query_strings_match_flask_app(async_app, client, headers, setup_employees, query_string):
+    app, _ = async_app
+    flask_app = create_app(dict(app.config))
+    with flask_app.app_context():
+        response = flask_app.test_client().get(f'/api/employees?{query_string}', headers=headers)
+
+    assert client.get(f'/api/employees?{query_string}', headers=headers) == (response.status_code, response.get_json())
+
+
+def test_get_employee(client, headers, setup_employees):
+    status, data = client.get('/api/employees/1', headers=headers)
+    assert status == 200
+    assert data['name'] == 'John Doe'
+    assert data['email'] == 'john.doe@example.com'
+    assert data['department'] == 'Engineering'
+    assert data['role'] == 'Developer'
+
+    status, data = client.get('/api/employees/999', headers=headers)
+    assert status == 404
+    assert 'message' in data
+
+
+def test_update_employee(client, headers, setup_employees):
+    status, data = client.put('/api/employees/1', headers=headers, json={
+        'name': 'John Updated', 'email': 'john.updated@example.com',
+        'department': 'Engineering', 'role': 'Senior Developer'
+    })
+    assert status == 200
+    assert data['message'] == 'Employee updated successfully!'
+    assert client.get('/api/employees/1', headers=headers)[1]['role'] == 'Senior Developer'
+
+    status, _ = client.put('/api/employees/999', headers=headers,
+                           json={'name': 'Non Existent', 'email': 'non.existent@example.com'})
+    assert status == 404
+
+    status, data = client.put('/api/employees/1', headers=headers,
+                              json={'name': 'John Doe', 'email': 'jane.smith@example.com'})
+    assert status == 400
+    assert data['message'] == 'Error: An employee with this email already exists.'
+
+    status, data = client.put('/api/employees/1', headers=headers, json={'name': 'John Doe'})
+    assert status == 500
+    assert 'message' in data
+
+
+def test_delete_employee(client, headers, setup_employees):
+    status, data = client.delete('/api/employees/2', headers=headers)
+    assert status == 200
+    assert data['message'] == 'Employee deleted successfully!'
+    assert client.get('/api/employees/2', headers=headers)[0] == 404
+
+    status, data = client.delete('/api/employees/999', headers=headers)
+    assert status == 404
+    assert data['message'] == 'Employee Id not found.'
@@ -0,0 +1,71 @@
+from cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(maxsize=2, ttl=60)
+    lru.set(1, 'one')
+    lru.set(2, 'two')
+    assert lru.get(1) == 'one'  # 2 is now the least recently used
+    lru.set(3, 'three')
+
+    assert lru.get(2) is None
+    assert lru.get(1) == 'one'
+    assert lru.get(3) == 'three'
+    assert lru.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    lru = LRUCache(maxsize=10, ttl=5, clock=clock)
+    lru.set('key', 'value')
+
+    clock.now = 4.9
+    assert lru.get('key') == 'value'
+    clock.now = 5.0
+    assert lru.get('key') is None
+
+    stats = lru.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['expirations'] == 1
+    assert stats['size'] == 0
+
+
+def test_delete_and_zero_size():
+    lru = LRUCache(maxsize=10, ttl=60)
+    lru.set('key', 'value')
+    lru.delete('key')
+    lru.delete('missing')
+    assert lru.get('key') is None
+
+    disabled = LRUCache(maxsize=0, ttl=60)
+    disabled.set('key', 'value')
+    assert disabled.get('key') is None
+
+
+def test_set_is_skipped_after_a_racing_delete():
+    lru = LRUCache(maxsize=2, ttl=60)
+    generation = lru.generation()
+    lru.delete('key')  # A writer invalidates while the reader is still reading
+    lru.set('key', 'stale', generation)
+    assert lru.get('key') is None
+
+    lru.set('key', 'fresh', lru.generation())
+    lru.set('other', 'value', generation)  # Never deleted since the token was taken
+    assert lru.get('key') == 'fresh'
+    assert lru.get('other') == 'value'
+
+    # Once its stamp is dropped, a key counts as deleted at the dropped generation
+    generation = lru.generation()
+    for key in ('a', 'b', 'c'):
+        lru.delete(key)
+    lru.set('a', 'stale', generation)
+    assert lru.get('a') is None
@@ -0,0 +1,108 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import pytest
+import requests
+
+if not hasattr(os, 'fork'):
+    pytest.skip('server.py needs fork()', allow_module_level=True)
+
+from app import create_app
+from models import db
+import migrations
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(params=[False, True], ids=['fork', 'preload'])
+def server(request, tmp_path):
+    database_uri = f'sqlite:///{tmp_path}/server.db'
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_uri})
+    with app.app_context():
+        migrations.init_schema(db.engine)
+    port = free_port()
+    command = [sys.executable, 'server.py', '--bind', f'127.0.0.1:{port}', '--workers', '2',
+               '--max-requests', '5', '--graceful-timeout', '5']
+    if request.param:
+        command.append('--preload')
+    process = subprocess.Popen(command, cwd=ROOT, env={**os.environ, 'DATABASE_URL': database_uri},
+                               stderr=subprocess.PIPE, text=True)
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            if requests.get(f'{url}/readyz', timeout=5).status_code == 200:
+                break
+        except requests.ConnectionError:
+            pass
+        assert process.poll() is None and time.monotonic() < deadline, 'server did not become ready'
+        time.sleep(0.1)
+    yield process, url
+    if process.poll() is None:
+        process.kill()
+        process.wait()
+
+
+## Server test cases
+
+def test_workers_recycle_reload_and_shut_down_gracefully(server):
+    process, url = server
+    login = {'username': 'UserName', 'password': 'UserSecret'}
+    token = requests.post(f'{url}/login', json=login).json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    for i in range(12):
+        response = requests.post(f'{url}/api/employees', headers=headers,
+                                 json={'name': f'Worker Test {i}', 'email': f'worker{i}@example.com'})
+        assert response.status_code == 201
+    assert requests.get(f'{url}/api/employees', headers=headers).json()['total'] == 12
+
+    process.send_signal(signal.SIGHUP)
+    for _ in range(10):
+        assert requests.get(f'{url}/readyz').status_code == 200
+
+    process.send_signal(signal.SIGTERM)
+    assert process.wait(timeout=10) == 0
+    log = process.stderr.read()
+    assert 'recycled after 5 requests' in log
+    assert 'Reloading: starting 2 new workers' in log
+    assert 'Traceback' not in log
+
+
+def test_workers_never_serve_a_stale_employee(server):
+    _, url = server
+    login = {'username': 'UserName', 'password': 'UserSecret'}
+    token = requests.post(f'{url}/login', json=login).json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    assert requests.post(f'{url}/api/employees', headers=headers,
+                         json={'name': 'Stale Check', 'email': 'stale@example.com'}).status_code == 201
+
+    # Every worker reads the employee, then one of them updates it
+    etags = {requests.get(f'{url}/api/employees/1', headers=headers).headers['ETag'] for _ in range(6)}
+    assert len(etags) == 1
+    response = requests.put(f'{url}/api/employees/1', headers=headers,
+                            json={'name': 'Fresh Check', 'email': 'stale@example.com'})
+    assert response.status_code == 200
+
+    stale_etag = etags.pop()
+    for _ in range(6):
+        response = requests.get(f'{url}/api/employees/1', headers={**headers, 'If-None-Match': stale_etag})
+        assert response.status_code == 200
+        assert response.json()['name'] == 'Fresh Check'
+
+
+def test_employee_cache_is_off_with_several_workers():
+    import server as production_server
+    assert production_server.app_config(1) == {}
+    app = production_server.load_app(None, production_server.app_config(4))
+    app.extensions['employee_cache'].set(1, 'employee')
+    assert app.extensions['employee_cache'].get(1) is None
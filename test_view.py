@@ -1,20 +1,34 @@
 import pytest
 import json
-from flask import jsonify
-from app import app_instance
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+from flask import jsonify, request
+from sqlalchemy import create_engine, event, text
+from app import create_app
 from models import db, Employee
-from flask_jwt_extended import create_access_token
+import auth
+import changes
+import idempotency
+import migrations
+import pagination
+import sqlite_profile
+from view import employee_cache
+from flask_jwt_extended import create_access_token, verify_jwt_in_request
 
 
 @pytest.fixture
-def client():
-    app_instance.config['TESTING'] = True
-    app_instance.config[
-        'SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    with app_instance.app_context():
-        db.create_all()  # Create database tables
-        yield app_instance.test_client()
-        db.drop_all()  # Clean up after tests
+def app():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+    with app.app_context():
+        migrations.init_schema(db.engine)  # Create database tables
+        yield app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
 
 
 @pytest.fixture
@@ -34,10 +48,10 @@ def setup_employees(client, jwt_token):
     db.session.commit()
     return employees
 
-def test_login_success(client):
+def test_login_success(client, app):
     # Set the username and password in the app's config for testing
-    app_instance.config['USERNAME'] = 'testuser'
-    app_instance.config['PASSWORD'] = 'testpass'
+    app.config['USERNAME'] = 'testuser'
+    app.config['PASSWORD'] = 'testpass'
 
     response = client.post('/login', json={
         'username': 'testuser',
@@ -48,9 +62,9 @@ def test_login_success(client):
     data = json.loads(response.data)
     assert 'access_token' in data
 
-def test_login_invalid_username(client):
-    app_instance.config['USERNAME'] = 'testuser'
-    app_instance.config['PASSWORD'] = 'testpass'
+def test_login_invalid_username(client, app):
+    app.config['USERNAME'] = 'testuser'
+    app.config['PASSWORD'] = 'testpass'
 
     response = client.post('/login', json={
         'username': 'wronguser',
@@ -61,9 +75,9 @@ def test_login_invalid_username(client):
     data = json.loads(response.data)
     assert data['message'] == 'Invalid username or password'
 
-def test_login_invalid_password(client):
-    app_instance.config['USERNAME'] = 'testuser'
-    app_instance.config['PASSWORD'] = 'testpass'
+def test_login_invalid_password(client, app):
+    app.config['USERNAME'] = 'testuser'
+    app.config['PASSWORD'] = 'testpass'
 
     response = client.post('/login', json={
         'username': 'testuser',
@@ -381,3 +395,1047 @@ def test_delete_employee_with_error(client, jwt_token):
     data = json.loads(response.data)
     assert data['message'] == 'Employee Id not found.'  # Ensure the correct error message is returned
 
+
+## bulk create endpoint test cases
+
+def test_bulk_create_employees_success(client, jwt_token):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    rows = [{'name': f'Bulk {i}', 'email': f'bulk{i}@example.com', 'department': 'Sales', 'role': 'Rep'}
+            for i in range(7)]
+
+    response = client.post('/api/employees/bulk?chunk_size=3', headers=headers, json=rows)
+
+    assert response.status_code == 201
+    data = json.loads(response.data)
+    assert data['created'] == 7
+    assert data['failed'] == 0
+    assert [result['index'] for result in data['results']] == list(range(7))
+    assert Employee.query.filter_by(department='Sales').count() == 7
+
+
+def test_bulk_create_employees_uses_one_insert_per_chunk(client, jwt_token):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    rows = [{'name': f'Chunked {i}', 'email': f'chunked{i}@example.com'} for i in range(10)]
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.lstrip().split()[0].upper())
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        response = client.post('/api/employees/bulk?chunk_size=4', headers=headers, json=rows)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    assert response.status_code == 201
+    # Three chunks, each one clash lookup, one executemany INSERT and one id lookup
+    assert statements.count('INSERT') == 3
+    assert statements.count('SELECT') == 6
+    ids = {employee.email: employee.id for employee in Employee.query}
+    assert [result['id'] for result in response.get_json()['results']] == \
+        [ids[f'chunked{i}@example.com'] for i in range(10)]
+
+
+def test_bulk_create_employees_reports_duplicates_per_row(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    rows = [
+        {'name': 'New Person', 'email': 'new.person@example.com'},
+        {'name': 'John Doe', 'email': 'another.john@example.com'},  # Existing name
+        {'name': 'Other Person', 'email': 'new.person@example.com'},  # Duplicate within the batch
+        {'name': 'Missing Email'},
+        {'name': 'Last Person', 'email': 'last.person@example.com'},
+    ]
+
+    response = client.post('/api/employees/bulk', headers=headers, json=rows)
+
+    assert response.status_code == 207
+    data = json.loads(response.data)
+    assert data['created'] == 2
+    assert data['failed'] == 3
+    statuses = [result['status'] for result in data['results']]
+    assert statuses == ['created', 'error', 'error', 'error', 'created']
+    assert data['results'][1]['message'] == "Employee should have a unique name and email."
+    assert Employee.query.count() == 6
+
+
+def test_bulk_create_employees_ndjson(client, jwt_token):
+    headers = {'Authorization': f'Bearer {jwt_token}', 'Content-Type': 'application/x-ndjson'}
+    body = '\n'.join([
+        json.dumps({'name': 'Nd One', 'email': 'nd.one@example.com'}),
+        '{not json',
+        json.dumps({'name': 'Nd Two', 'email': 'nd.two@example.com', 'role': 'Analyst'}),
+    ]) + '\n'
+
+    response = client.post('/api/employees/bulk', headers=headers, data=body)
+
+    assert response.status_code == 207
+    data = json.loads(response.data)
+    assert data['created'] == 2
+    assert data['results'][1]['status'] == 'error'
+    assert data['results'][1]['message'].startswith('Invalid JSON')
+
+
+def test_bulk_create_employees_invalid_body(client, jwt_token):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+
+    response = client.post('/api/employees/bulk', headers=headers, json={'name': 'Not A List'})
+
+    assert response.status_code == 400
+    data = json.loads(response.data)
+    assert 'message' in data
+
+## cursor pagination test cases
+
+def test_get_employees_cursor_walks_all_pages(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    seen = []
+    url = '/api/employees?limit=3'
+    while url:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert 'total' not in data
+        seen.extend(emp['id'] for emp in data['employees'])
+        url = f"/api/employees?limit=3&after={data['next_cursor']}" if data['next_cursor'] else None
+
+    assert seen == [1, 2, 3, 4]
+
+
+def test_get_employees_cursor_sorted_by_name_with_filter(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    response = client.get('/api/employees?department=HR&sort=-name&limit=1&include_total=true', headers=headers)
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['total'] == 2
+    assert [emp['name'] for emp in data['employees']] == ['Bob Brown']
+
+    response = client.get(f"/api/employees?department=HR&sort=-name&limit=1&after={data['next_cursor']}",
+                          headers=headers)
+    data = json.loads(response.data)
+    assert [emp['name'] for emp in data['employees']] == ['Alice Johnson']
+    assert data['next_cursor'] is None
+
+
+def test_get_employees_cursor_invalid(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    first = json.loads(client.get('/api/employees?limit=1', headers=headers).data)
+
+    response = client.get('/api/employees?after=not-a-cursor', headers=headers)
+    assert response.status_code == 400
+
+    # A cursor issued for one sort order cannot be replayed against another
+    response = client.get(f"/api/employees?sort=name&after={first['next_cursor']}", headers=headers)
+    assert response.status_code == 400
+
+    response = client.get('/api/employees?sort=joining_date&limit=2', headers=headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('key', [[['a'], 1], [{'a': 1}, 1], [True, 1], ['John Doe', True]])
+def test_get_employees_cursor_rejects_crafted_keys(client, jwt_token, setup_employees, key):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    cursor = pagination.encode_key('name', *key)
+
+    response = client.get(f'/api/employees?sort=name&after={cursor}', headers=headers)
+    assert response.status_code == 400
+
+
+## schema migration and query plan test cases
+
+def test_upgrade_adds_indexes_to_existing_database(tmp_path):
+    path = tmp_path / 'old.db'
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE employees (
+        id INTEGER NOT NULL, name VARCHAR(100) NOT NULL, email VARCHAR(100) NOT NULL,
+        department VARCHAR(100), role VARCHAR(100), date_joined DATETIME,
+        PRIMARY KEY (id), UNIQUE (name), UNIQUE (email))""")
+    # Created by earlier versions of migration 1, and dropped again by migration 6
+    conn.execute("CREATE INDEX ix_employees_department ON employees (department)")
+    conn.execute("INSERT INTO employees (name, email) VALUES ('Old Timer', 'old@example.com')")
+    conn.commit()
+    conn.close()
+
+    engine = create_engine(f'sqlite:///{path}')
+    assert migrations.upgrade(engine) == [version for version, _, _ in migrations.MIGRATIONS]
+    assert migrations.upgrade(engine) == []  # Already applied
+
+    with engine.connect() as conn:
+        indexes = {row[1] for row in conn.execute(text("PRAGMA index_list('employees')"))}
+        assert {'ix_employees_role', 'ix_employees_department_role_id'} <= indexes
+        assert 'ix_employees_department' not in indexes
+        assert conn.execute(text('SELECT count(*) FROM employees')).scalar() == 1
+        columns = {row[1] for row in conn.execute(text("PRAGMA table_info('employees')"))}
+        assert {'version', 'updated_at'} <= columns
+
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO employees (name, email) VALUES ('New Timer', 'new@example.com')"))
+        assert conn.execute(text("SELECT version FROM table_versions WHERE name = 'employees'")).scalar() == 1
+    engine.dispose()
+
+
+@pytest.mark.parametrize('query_string', [
+    'department=Engineering',
+    'role=Manager',
+    'department=HR&role=Manager',
+    'department=HR&limit=1',
+    'role=Developer&limit=1&include_total=true',
+])
+def test_filtered_list_queries_use_indexes(client, jwt_token, setup_employees, query_string):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get(f'/api/employees?{query_string}', headers=headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    assert response.status_code == 200
+    assert statements
+    for statement, parameters in statements:
+        plan = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+        details = [row[-1] for row in plan]
+        assert not any(detail.startswith('SCAN employees') for detail in details), (statement, details)
+
+
+## export endpoint test cases
+
+def test_export_employees_ndjson(client, jwt_token, setup_employees, monkeypatch, app):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    monkeypatch.setitem(app.config, 'EXPORT_BATCH_SIZE', 3)
+    response = client.get('/api/employees/export?format=ndjson', headers=headers)
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [row['id'] for row in rows] == [1, 2, 3, 4]
+    assert rows[0]['name'] == 'John Doe'
+
+
+def test_export_employees_csv_with_filter(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    response = client.get('/api/employees/export?format=csv&department=HR', headers=headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    lines = response.data.decode().splitlines()
+    assert lines[0] == 'id,name,email,department,role,joining_date'
+    assert [line.split(',')[1] for line in lines[1:]] == ['Alice Johnson', 'Bob Brown']
+
+
+def test_export_employees_invalid_format(client, jwt_token):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    response = client.get('/api/employees/export?format=xml', headers=headers)
+
+    assert response.status_code == 400
+
+
+## single employee cache test cases
+
+def test_get_employee_served_from_cache(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    before = employee_cache.stats()
+
+    first = client.get('/api/employees/1', headers=headers)
+    second = client.get('/api/employees/1', headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert json.loads(first.data) == json.loads(second.data)
+    after = employee_cache.stats()
+    assert after['misses'] == before['misses'] + 1
+    assert after['hits'] == before['hits'] + 1
+
+
+def test_get_employee_does_not_cache_row_invalidated_while_read(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+
+    def invalidate(conn, cursor, statement, parameters, context, executemany):
+        # A writer commits and invalidates between the reader's SELECT and its cache fill
+        employee_cache.delete(1)
+
+    event.listen(db.engine, 'after_cursor_execute', invalidate)
+    try:
+        assert client.get('/api/employees/1', headers=headers).status_code == 200
+    finally:
+        event.remove(db.engine, 'after_cursor_execute', invalidate)
+
+    assert employee_cache.get(1) is None
+
+
+def test_update_and_delete_invalidate_cache(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    client.get('/api/employees/1', headers=headers)
+
+    client.put('/api/employees/1', headers=headers, json={
+        'name': 'John Cached', 'email': 'john.cached@example.com', 'role': 'Lead'
+    })
+    data = json.loads(client.get('/api/employees/1', headers=headers).data)
+    assert data['name'] == 'John Cached'
+    assert data['role'] == 'Lead'
+
+    client.delete('/api/employees/1', headers=headers)
+    response = client.get('/api/employees/1', headers=headers)
+    assert response.status_code == 404
+
+
+def test_cache_stats_endpoint(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    client.get('/api/employees/2', headers=headers)
+
+    response = client.get('/api/cache/stats', headers=headers)
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert {'size', 'maxsize', 'hits', 'misses', 'evictions'} <= set(data)
+    assert data['size'] >= 1
+
+
+## conditional request test cases
+
+def test_get_employee_not_modified(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    response = client.get('/api/employees/1', headers=headers)
+    etag = response.headers['ETag']
+
+    response = client.get('/api/employees/1', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+    # Revalidation also works when the employee is not cached
+    employee_cache.clear()
+    response = client.get('/api/employees/1', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+def test_get_employee_etag_changes_on_update(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    etag = client.get('/api/employees/1', headers=headers).headers['ETag']
+
+    client.put('/api/employees/1', headers=headers, json={'name': 'John Doe', 'email': 'jd@example.com'})
+
+    response = client.get('/api/employees/1', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert Employee.query.get(1).version == 2
+
+
+def test_get_employees_not_modified_until_table_changes(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    response = client.get('/api/employees?department=HR', headers=headers)
+    etag = response.headers['ETag']
+
+    response = client.get('/api/employees?department=HR', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+
+    # Different query parameters never share a tag
+    response = client.get('/api/employees?department=Engineering', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+
+    client.post('/api/employees', headers=headers, json={'name': 'New Hire', 'email': 'new.hire@example.com'})
+    response = client.get('/api/employees?department=HR', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+
+
+def test_update_employee_if_match(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    etag = client.get('/api/employees/1', headers=headers).headers['ETag']
+    update_data = {'name': 'John Doe', 'email': 'john.doe@example.com', 'role': 'Lead'}
+
+    response = client.put('/api/employees/1', headers={**headers, 'If-Match': etag}, json=update_data)
+    assert response.status_code == 200
+
+    # The first update bumped the version, so the old tag is now stale
+    response = client.put('/api/employees/1', headers={**headers, 'If-Match': etag}, json=update_data)
+    assert response.status_code == 412
+
+
+def test_delete_employee_if_match(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+
+    response = client.delete('/api/employees/2', headers={**headers, 'If-Match': '"employee-2-v9"'})
+    assert response.status_code == 412
+
+    etag = client.get('/api/employees/2', headers=headers).headers['ETag']
+    response = client.delete('/api/employees/2', headers={**headers, 'If-Match': etag})
+    assert response.status_code == 200
+
+
+## serialization test cases
+
+def test_list_detail_and_model_share_one_representation(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    listed = json.loads(client.get('/api/employees?department=HR', headers=headers).data)['employees'][0]
+    detail = json.loads(client.get(f"/api/employees/{listed['id']}", headers=headers).data)
+
+    assert listed == detail == Employee.query.get(listed['id']).to_dict()
+    assert set(detail) == {'id', 'name', 'email', 'department', 'role', 'joining_date'}
+
+
+def test_json_provider_round_trips_non_ascii(client, jwt_token):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    client.post('/api/employees', headers=headers, json={'name': 'Zoë Ångström', 'email': 'zoe@example.com'})
+
+    response = client.get('/api/employees', headers=headers)
+    assert response.status_code == 200
+    assert json.loads(response.data)['employees'][0]['name'] == 'Zoë Ångström'
+
+
+def test_json_provider_accepts_every_jsonify_form(app):
+    assert json.loads(jsonify({'a': 1}).data) == {'a': 1}
+    assert json.loads(jsonify(1, 'two').data) == [1, 'two']
+    assert json.loads(jsonify(a=1).data) == {'a': 1}
+    assert json.loads(jsonify().data) == {}
+    with pytest.raises(TypeError):
+        jsonify({'a': 1}, b=2)
+
+
+## engine profile and concurrency test cases
+
+def test_production_profile_pragmas(tmp_path):
+    config = {'SQLITE_PROFILE': 'production', 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/profile.db'}
+    engine = create_engine(config['SQLALCHEMY_DATABASE_URI'], **sqlite_profile.engine_options(config))
+    sqlite_profile.install(engine, config['SQLITE_PROFILE'])
+
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+        assert conn.exec_driver_sql('PRAGMA synchronous').scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql('PRAGMA busy_timeout').scalar() == 5000
+    assert engine.pool.size() == 10
+    engine.dispose()
+
+    assert sqlite_profile.engine_options({**config, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'}) == {}
+
+
+def test_concurrent_creates_and_lists(tmp_path):
+    # Concurrency needs a real file: the in-memory test database is one shared connection
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/concurrent.db'})
+    with app.app_context():
+        migrations.init_schema(db.engine)
+        headers = {'Authorization': f"Bearer {create_access_token(identity='testuser')}"}
+    threads_count, per_thread = 8, 15
+    statuses = []
+    lock = threading.Lock()
+
+    def worker(worker_id):
+        thread_client = app.test_client()
+        for i in range(per_thread):
+            created = thread_client.post('/api/employees', headers=headers, json={
+                'name': f'Worker {worker_id}-{i}', 'email': f'worker{worker_id}.{i}@example.com'
+            })
+            listed = thread_client.get('/api/employees?limit=5', headers=headers)
+            with lock:
+                statuses.extend([created.status_code, listed.status_code])
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses.count(201) == threads_count * per_thread
+    assert statuses.count(200) == threads_count * per_thread
+    with app.app_context():
+        assert Employee.query.count() == threads_count * per_thread
+        db.engine.dispose()
+
+
+## metrics test cases
+
+def test_metrics_endpoint_records_requests(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    client.get('/api/employees/1', headers=headers)
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    body = response.data.decode()
+    assert 'http_requests_total{endpoint="get_employee",method="GET",status="200"}' in body
+    assert 'http_request_duration_seconds_bucket{endpoint="get_employee",method="GET",le="+Inf"}' in body
+    assert 'http_request_sql_statements_count{endpoint="get_employee"}' in body
+    assert 'jwt_verification_seconds_count' in body
+    assert 'employee_cache{stat="misses"}' in body
+
+
+def test_server_timing_header(client, jwt_token, setup_employees, monkeypatch, app):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    response = client.get('/api/employees', headers=headers)
+    assert 'Server-Timing' not in response.headers
+
+    monkeypatch.setitem(app.config, 'SERVER_TIMING', True)
+    response = client.get('/api/employees', headers=headers)
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('app;dur=')
+    assert 'desc="3 statements"' in timing  # change counter, count and page
+    assert 'jwt;dur=' in timing
+
+
+def test_slow_request_log_includes_sql(client, jwt_token, setup_employees, monkeypatch, caplog, app):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    monkeypatch.setitem(app.config, 'SLOW_REQUEST_SECONDS', 0)
+
+    with caplog.at_level('WARNING', logger='habot.slow_requests'):
+        client.get('/api/employees?department=HR', headers=headers)
+
+    assert 'Slow request GET /api/employees?department=HR' in caplog.text
+    assert 'FROM employees' in caplog.text
+
+
+## search endpoint test cases
+
+def test_search_employees_by_prefix(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    response = client.get('/api/employees/search?q=jo', headers=headers)
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    names = [emp['name'] for emp in data['employees']]
+    # Name matches (John, Johnson) rank above the email-only match (john.doe@)
+    assert sorted(names) == ['Alice Johnson', 'John Doe']
+
+    response = client.get('/api/employees/search?q=ali%20jo', headers=headers)
+    assert [emp['name'] for emp in json.loads(response.data)['employees']] == ['Alice Johnson']
+
+    response = client.get('/api/employees/search?q=manag&department=HR', headers=headers)
+    assert len(json.loads(response.data)['employees']) == 2
+
+
+def test_search_employees_ranked_pages(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    seen = []
+    url = '/api/employees/search?q=example&limit=3'
+    while url:
+        data = json.loads(client.get(url, headers=headers).data)
+        assert data['ranked'] is True
+        seen.extend(emp['id'] for emp in data['employees'])
+        url = f"/api/employees/search?q=example&limit=3&after={data['next_cursor']}" if data['next_cursor'] else None
+
+    assert sorted(seen) == [1, 2, 3, 4]
+    assert len(seen) == 4
+
+
+def test_search_employees_too_broad_to_rank_pages_by_id(client, jwt_token, setup_employees, monkeypatch, app):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    monkeypatch.setitem(app.config, 'SEARCH_MAX_RANKED_MATCHES', 3)
+    seen = []
+    url = '/api/employees/search?q=example&limit=3'
+    while url:
+        data = json.loads(client.get(url, headers=headers).data)
+        assert data['ranked'] is False
+        seen.extend(emp['id'] for emp in data['employees'])
+        url = f"/api/employees/search?q=example&limit=3&after={data['next_cursor']}" if data['next_cursor'] else None
+    assert seen == [1, 2, 3, 4]
+
+    # Filters count towards the limit: two HR matches can still be ranked
+    data = json.loads(client.get('/api/employees/search?q=example&department=HR', headers=headers).data)
+    assert data['ranked'] is True
+    assert sorted(emp['id'] for emp in data['employees']) == [3, 4]
+
+
+def test_search_index_follows_writes(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    client.put('/api/employees/1', headers=headers, json={'name': 'Zed Renamed', 'email': 'zed@example.com'})
+    client.delete('/api/employees/2', headers=headers)
+    client.post('/api/employees/bulk', headers=headers, json=[{'name': 'Zelda Bulk', 'email': 'zelda@example.com'}])
+
+    data = json.loads(client.get('/api/employees/search?q=ze', headers=headers).data)
+    assert sorted(emp['name'] for emp in data['employees']) == ['Zed Renamed', 'Zelda Bulk']
+    data = json.loads(client.get('/api/employees/search?q=john', headers=headers).data)
+    assert [emp['name'] for emp in data['employees']] == ['Alice Johnson']
+    data = json.loads(client.get('/api/employees/search?q=jane', headers=headers).data)
+    assert data['employees'] == []
+
+
+def test_search_employees_invalid_queries(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    assert client.get('/api/employees/search?q=%20', headers=headers).status_code == 400
+    assert client.get('/api/employees/search?q=jo&after=bogus', headers=headers).status_code == 400
+    # Search cursors carry the rank, which must be a number
+    for rank in ('john', None, [1]):
+        cursor = pagination.encode_key('rank', rank, 1)
+        assert client.get(f'/api/employees/search?q=jo&after={cursor}', headers=headers).status_code == 400
+
+    # FTS5 operators and quotes in user input are treated as plain words
+    response = client.get('/api/employees/search?q=%22john%20OR%20NEAR(', headers=headers)
+    assert response.status_code == 200
+
+
+## stats endpoint test cases
+
+def test_employee_stats(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    response = client.get('/api/employees/stats', headers=headers)
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['total'] == 4
+    assert data['by_department'] == [{'department': 'Engineering', 'count': 2}, {'department': 'HR', 'count': 2}]
+    assert data['by_role'] == [{'role': 'Developer', 'count': 2}, {'role': 'Manager', 'count': 2}]
+    assert {'department': 'HR', 'role': 'Manager', 'count': 2} in data['by_department_role']
+
+
+def test_employee_stats_follow_writes(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    client.put('/api/employees/1', headers=headers, json={
+        'name': 'John Doe', 'email': 'john.doe@example.com', 'department': 'HR', 'role': 'Manager'
+    })
+    client.delete('/api/employees/2', headers=headers)
+    client.post('/api/employees', headers=headers, json={'name': 'No Dept', 'email': 'no.dept@example.com'})
+    client.post('/api/employees/bulk', headers=headers, json=[
+        {'name': 'Sales One', 'email': 's1@example.com', 'department': 'Sales', 'role': 'Rep'},
+        {'name': 'Sales Two', 'email': 's2@example.com', 'department': 'Sales', 'role': 'Rep'},
+    ])
+
+    data = json.loads(client.get('/api/employees/stats', headers=headers).data)
+    assert data['total'] == Employee.query.count() == 6
+    assert data['by_department'] == [
+        {'department': None, 'count': 1}, {'department': 'HR', 'count': 3}, {'department': 'Sales', 'count': 2}
+    ]
+    assert {'department': 'HR', 'role': 'Manager', 'count': 3} in data['by_department_role']
+    # The Engineering group emptied out and was removed
+    assert all(group['department'] != 'Engineering' for group in data['by_department_role'])
+
+
+## set-based update/delete test cases
+
+def test_bulk_update_by_filter(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    etag = client.get('/api/employees/3', headers=headers).headers['ETag']
+
+    response = client.patch('/api/employees?department=HR', headers=headers, json={'department': 'People'})
+
+    assert response.status_code == 200
+    assert json.loads(response.data) == {'updated': 2}
+    # The cached copy was dropped and the version bumped
+    response = client.get('/api/employees/3', headers=headers)
+    assert json.loads(response.data)['department'] == 'People'
+    assert response.headers['ETag'] != etag
+    stats = json.loads(client.get('/api/employees/stats', headers=headers).data)
+    assert {'department': 'People', 'count': 2} in stats['by_department']
+
+
+def test_bulk_update_by_ids_and_role(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    response = client.patch('/api/employees?role=Developer&ids=1,3', headers=headers, json={'role': 'Lead'})
+
+    assert json.loads(response.data) == {'updated': 1}
+    assert db.session.get(Employee, 1).role == 'Lead'
+    assert db.session.get(Employee, 3).role == 'Manager'
+
+
+def test_bulk_update_rejects_bad_requests(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    assert client.patch('/api/employees', headers=headers, json={'role': 'Lead'}).status_code == 400
+    assert client.patch('/api/employees?role=Developer', headers=headers, json={'email': 'x@example.com'}).status_code == 400
+    assert client.patch('/api/employees?ids=1,x', headers=headers, json={'role': 'Lead'}).status_code == 400
+    assert Employee.query.filter_by(role='Lead').count() == 0
+
+
+def test_bulk_delete(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    client.get('/api/employees/1', headers=headers)
+
+    response = client.delete('/api/employees', headers=headers, json={'ids': [1, 3, 999]})
+    assert json.loads(response.data) == {'deleted': 2}
+    assert client.get('/api/employees/1', headers=headers).status_code == 404
+
+    response = client.delete('/api/employees?department=Engineering', headers=headers)
+    assert json.loads(response.data) == {'deleted': 1}
+    assert client.delete('/api/employees', headers=headers).status_code == 400
+    assert Employee.query.count() == 1
+
+
+## partial update test cases
+
+def test_patch_employee_single_statement(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    etag = client.get('/api/employees/1', headers=headers).headers['ETag']
+    statements = []
+    capture = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        response = client.patch('/api/employees/1', headers={**headers, 'If-Match': etag}, json={'role': 'Lead'})
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['role'] == 'Lead' and data['name'] == 'John Doe'
+    assert response.headers['ETag'] == '"employee-1-v2"'
+    assert len(statements) == 1 and statements[0].startswith('UPDATE employees')
+    assert json.loads(client.get('/api/employees/1', headers=headers).data)['role'] == 'Lead'
+
+
+def test_patch_employee_version_conflict(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    assert client.patch('/api/employees/1', headers=headers, json={'role': 'Lead', 'version': 1}).status_code == 200
+
+    response = client.patch('/api/employees/1', headers=headers, json={'role': 'Architect', 'version': 1})
+    assert response.status_code == 409
+    response = client.patch('/api/employees/1', headers={**headers, 'If-Match': '"employee-1-v1"'},
+                            json={'role': 'Architect'})
+    assert response.status_code == 412
+    # A failed If-Match is a failed precondition even when the body has a version
+    response = client.patch('/api/employees/1', headers={**headers, 'If-Match': '"employee-1-v1"'},
+                            json={'role': 'Architect', 'version': 1})
+    assert response.status_code == 412
+    assert db.session.get(Employee, 1).role == 'Lead'
+
+
+def test_patch_employee_errors(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    assert client.patch('/api/employees/999', headers=headers, json={'role': 'Lead'}).status_code == 404
+    assert client.patch('/api/employees/999', headers=headers, json={'role': 'Lead', 'version': 1}).status_code == 404
+    assert client.patch('/api/employees/1', headers=headers, json={}).status_code == 400
+    assert client.patch('/api/employees/1', headers=headers, json={'name': ''}).status_code == 400
+    assert client.patch('/api/employees/1', headers=headers, json={'salary': 1}).status_code == 400
+    response = client.patch('/api/employees/1', headers=headers, json={'email': 'jane.smith@example.com'})
+    assert response.status_code == 400
+
+
+## batch lookup test cases
+
+def test_batch_get_keeps_order_and_reports_missing(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    response = client.get('/api/employees?ids=3,999,1,3', headers=headers)
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [employee['id'] for employee in data['employees']] == [3, 1]
+    assert data['employees'][0]['name'] == 'Alice Johnson'
+    assert data['missing'] == [999]
+
+
+def test_batch_get_post_uses_cache_and_chunks(client, jwt_token, setup_employees, monkeypatch, app):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    monkeypatch.setitem(app.config, 'BATCH_GET_CHUNK_SIZE', 2)
+    client.get('/api/employees/2', headers=headers)
+    statements = []
+    capture = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        response = client.post('/api/employees/batch-get', headers=headers, json={'ids': [4, 2, 1, 3]})
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    data = json.loads(response.data)
+    assert [employee['id'] for employee in data['employees']] == [4, 2, 1, 3]
+    # Employee 2 came from the cache, the other three took two IN queries
+    assert len([statement for statement in statements if 'FROM employees' in statement]) == 2
+    assert employee_cache.get(4) is not None
+
+
+def test_batch_get_invalid_ids(client, jwt_token, setup_employees, monkeypatch, app):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    monkeypatch.setitem(app.config, 'MAX_BATCH_GET_IDS', 2)
+    assert client.get('/api/employees?ids=1,a', headers=headers).status_code == 400
+    assert client.get('/api/employees?ids=1,2,3', headers=headers).status_code == 400
+    assert client.post('/api/employees/batch-get', headers=headers, json={}).status_code == 400
+
+
+## change feed test cases
+
+def test_change_feed_returns_latest_state_in_order(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    data = json.loads(client.get('/api/employees/changes', headers=headers).data)
+    assert [(change['op'], change['id']) for change in data['changes']] == [('upsert', i) for i in (1, 2, 3, 4)]
+    since = data['next_since']
+
+    client.patch('/api/employees/1', headers=headers, json={'role': 'Lead'})
+    client.patch('/api/employees/1', headers=headers, json={'role': 'Architect'})
+    client.delete('/api/employees/2', headers=headers)
+    client.patch('/api/employees?department=HR', headers=headers, json={'department': 'People'})
+
+    data = json.loads(client.get(f'/api/employees/changes?since={since}', headers=headers).data)
+    assert [(change['op'], change['id']) for change in data['changes']] == [
+        ('upsert', 1), ('delete', 2), ('upsert', 3), ('upsert', 4)
+    ]
+    assert data['changes'][0]['employee']['role'] == 'Architect'
+    assert 'employee' not in data['changes'][1]
+    assert data['has_more'] is False
+
+
+def test_change_feed_pages_with_limit(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    first = json.loads(client.get('/api/employees/changes?limit=3', headers=headers).data)
+    second = json.loads(client.get(f"/api/employees/changes?limit=3&since={first['next_since']}", headers=headers).data)
+
+    assert len(first['changes']) == 3 and first['has_more'] is True
+    assert [change['id'] for change in second['changes']] == [4]
+    assert second['has_more'] is False
+    assert client.get('/api/employees/changes?since=-1', headers=headers).status_code == 400
+
+
+def test_change_feed_purges_old_tombstones(client, jwt_token, setup_employees, monkeypatch, app):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    since = json.loads(client.get('/api/employees/changes', headers=headers).data)['next_since']
+    client.delete('/api/employees/2', headers=headers)
+    client.patch('/api/employees/1', headers=headers, json={'role': 'Lead'})
+    monkeypatch.setitem(app.config, 'CHANGE_LOG_RETENTION', timedelta(seconds=-60))
+    monkeypatch.setattr(changes, '_next_purge', 0.0)
+
+    response = client.get(f'/api/employees/changes?since={since}', headers=headers)
+    assert response.status_code == 410
+    # A fresh snapshot no longer needs the tombstones
+    data = json.loads(client.get('/api/employees/changes', headers=headers).data)
+    assert [(change['op'], change['id']) for change in data['changes']] == [('upsert', 3), ('upsert', 4), ('upsert', 1)]
+    response = client.get(f"/api/employees/changes?since={data['next_since']}", headers=headers)
+    assert response.status_code == 200
+
+
+## idempotency and upsert test cases
+
+def test_create_employee_idempotency_key_replays(client, jwt_token):
+    headers = {'Authorization': f'Bearer {jwt_token}', 'Idempotency-Key': 'create-1'}
+    employee = {'name': 'Retry Roe', 'email': 'retry@example.com'}
+    first = client.post('/api/employees', headers=headers, json=employee)
+    statements = []
+    capture = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        second = client.post('/api/employees', headers=headers, json=employee)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    assert first.status_code == second.status_code == 201
+    assert second.data == first.data
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert statements == []
+    assert Employee.query.filter_by(email='retry@example.com').count() == 1
+
+
+def test_create_employee_idempotency_key_reused_with_other_body(client, jwt_token):
+    headers = {'Authorization': f'Bearer {jwt_token}', 'Idempotency-Key': 'create-2'}
+    client.post('/api/employees', headers=headers, json={'name': 'Key Owner', 'email': 'owner@example.com'})
+
+    response = client.post('/api/employees', headers=headers, json={'name': 'Other', 'email': 'other@example.com'})
+    assert response.status_code == 422
+    assert Employee.query.filter_by(email='other@example.com').count() == 0
+
+
+def test_create_employee_idempotency_key_covers_query_string(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}', 'Idempotency-Key': 'create-3'}
+    employee = {'name': 'John Doe', 'email': 'john.doe@example.com', 'role': 'Lead'}
+    assert client.post('/api/employees', headers=headers, json=employee).status_code == 400
+
+    # Same key and body but an upsert is a different request, not a retry
+    response = client.post('/api/employees?upsert=email', headers=headers, json=employee)
+    assert response.status_code == 422
+    assert 'Idempotent-Replayed' not in response.headers
+
+
+def test_idempotency_keys_are_shared_between_apps(tmp_path, jwt_token):
+    config = {'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/shared.db'}
+    first, second = create_app(config), create_app(config)
+    with first.app_context():
+        migrations.init_schema(db.engine)
+    headers = {'Authorization': f'Bearer {jwt_token}', 'Idempotency-Key': 'shared-1'}
+    employee = {'name': 'Two Workers', 'email': 'two.workers@example.com'}
+
+    created = first.test_client().post('/api/employees', headers=headers, json=employee)
+    replayed = second.test_client().post('/api/employees', headers=headers, json=employee)
+
+    assert created.status_code == replayed.status_code == 201
+    assert replayed.headers['Idempotent-Replayed'] == 'true'
+    assert replayed.data == created.data
+
+    # A key reserved by one app is in progress for the other
+    with first.test_request_context('/api/employees', method='POST', json=employee):
+        first.extensions['idempotency_store'].begin(('testuser', 'shared-2'), idempotency.fingerprint(request))
+    response = second.test_client().post('/api/employees', headers={**headers, 'Idempotency-Key': 'shared-2'},
+                                         json=employee)
+    assert response.status_code == 409
+
+    with second.app_context():
+        assert Employee.query.filter_by(email='two.workers@example.com').count() == 1
+        db.engine.dispose()
+    with first.app_context():
+        db.engine.dispose()
+
+
+def test_expired_idempotency_key_can_be_reused(client, jwt_token, app):
+    headers = {'Authorization': f'Bearer {jwt_token}', 'Idempotency-Key': 'expiring'}
+    client.post('/api/employees', headers=headers, json={'name': 'First Use', 'email': 'first.use@example.com'})
+
+    app.extensions['idempotency_store'].backend.clear()
+    db.session.execute(text('UPDATE idempotency_keys SET expires_at = :past'), {'past': '2000-01-01 00:00:00'})
+    db.session.commit()
+    response = client.post('/api/employees', headers=headers, json={'name': 'Second Use', 'email': 'second@example.com'})
+    assert response.status_code == 201
+    assert 'Idempotent-Replayed' not in response.headers
+
+
+def test_upsert_employee_by_email(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    employee = {'name': 'New Hire', 'email': 'new.hire@example.com', 'department': 'Sales'}
+
+    response = client.post('/api/employees?upsert=email', headers=headers, json=employee)
+    assert response.status_code == 201
+    employee_id = json.loads(response.data)['id']
+
+    response = client.post('/api/employees?upsert=email', headers=headers, json={**employee, 'role': 'Rep'})
+    assert response.status_code == 200
+    assert json.loads(response.data) == {'message': 'Employee updated successfully!', 'id': employee_id}
+    assert db.session.get(Employee, employee_id).version == 2
+
+    response = client.post('/api/employees?upsert=email', headers=headers, json={**employee, 'role': 'Rep'})
+    assert json.loads(response.data) == {'message': 'Employee unchanged.', 'id': employee_id}
+    db.session.expire_all()
+    assert db.session.get(Employee, employee_id).version == 2
+
+
+def test_upsert_employee_rejects_taken_name(client, jwt_token, setup_employees):
+    headers = {'Authorization': f'Bearer {jwt_token}'}
+    response = client.post('/api/employees?upsert=email', headers=headers,
+                           json={'name': 'John Doe', 'email': 'someone.else@example.com'})
+    assert response.status_code == 400
+    assert client.post('/api/employees?upsert=email', headers=headers, json={'name': 'No Email'}).status_code == 400
+
+
+## application factory test cases
+
+def test_create_app_does_not_touch_the_database(tmp_path):
+    path = tmp_path / 'lazy.db'
+    create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    assert not path.exists()
+
+
+def test_init_db_command(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/cli.db'})
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['init-db'])
+    assert result.exit_code == 0
+    assert result.output.startswith('Applied migrations: 1, 2')
+    assert runner.invoke(args=['init-db']).output == 'Schema is up to date.\n'
+    with app.app_context():
+        assert Employee.query.count() == 0
+        db.engine.dispose()
+
+
+## verified token cache test cases
+
+@pytest.fixture
+def cached_auth_app(monkeypatch):
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:', 'JWT_CLAIMS_CACHE_SIZE': 10})
+    verifications = []
+
+    def counting_verify():
+        verifications.append(1)
+        return verify_jwt_in_request()
+
+    monkeypatch.setattr(auth, 'verify_jwt_in_request', counting_verify)
+    with app.app_context():
+        migrations.init_schema(db.engine)
+        yield app, verifications
+
+
+def test_jwt_claims_cache_skips_repeat_verification(cached_auth_app):
+    app, verifications = cached_auth_app
+    client = app.test_client()
+    headers = {'Authorization': f"Bearer {create_access_token(identity='service')}"}
+
+    for _ in range(3):
+        assert client.get('/api/cache/stats', headers=headers).status_code == 200
+    assert len(verifications) == 1
+    # Identity is still available to the views on a cache hit
+    response = client.post('/api/employees', headers={**headers, 'Idempotency-Key': 'k'},
+                           json={'name': 'Cached Caller', 'email': 'cached@example.com'})
+    assert response.status_code == 201
+    assert len(verifications) == 1
+    other = {'Authorization': f"Bearer {create_access_token(identity='other')}"}
+    client.get('/api/cache/stats', headers=other)
+    assert len(verifications) == 2
+
+
+def test_jwt_claims_cache_respects_revocation_and_expiry(cached_auth_app, monkeypatch):
+    app, verifications = cached_auth_app
+    client = app.test_client()
+    headers = {'Authorization': f"Bearer {create_access_token(identity='service')}"}
+    assert client.get('/api/cache/stats', headers=headers).status_code == 200
+
+    manager = app.extensions['flask-jwt-extended']
+    monkeypatch.setattr(manager, '_token_in_blocklist_callback', lambda header, data: True)
+    response = client.get('/api/cache/stats', headers=headers)
+    assert response.status_code == 401
+    assert len(verifications) == 1
+    monkeypatch.undo()
+    monkeypatch.setattr(auth, 'verify_jwt_in_request', lambda: verifications.append(1) or verify_jwt_in_request())
+
+    # An entry past the token's exp is never served from the cache
+    monkeypatch.setattr(auth.time, 'time', lambda: time.time_ns() / 1e9 + 2 * 60 * 60)
+    assert client.get('/api/cache/stats', headers=headers).status_code == 200
+    assert len(verifications) == 2
+
+
+## readiness test cases
+
+def test_readiness_requires_migrated_schema():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+    client = app.test_client()
+    response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.get_json()['pending'] == [version for version, _, _ in migrations.MIGRATIONS]
+
+    with app.app_context():
+        migrations.init_schema(db.engine)
+    response = client.get('/readyz')
+    assert response.status_code == 200
+    assert response.get_json() == {'status': 'ready'}
+
+
+## admission control test cases
+
+def admission_app(**config):
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:', **config})
+    with app.app_context():
+        migrations.init_schema(db.engine)
+    return app
+
+
+def test_rate_limit_is_per_identity():
+    app = admission_app(RATE_LIMIT_PER_SECOND=0.5, RATE_LIMIT_BURST=2)
+    client = app.test_client()
+    with app.app_context():
+        alice = {'Authorization': f"Bearer {create_access_token(identity='alice')}"}
+        bob = {'Authorization': f"Bearer {create_access_token(identity='bob')}"}
+
+    assert [client.get('/api/cache/stats', headers=alice).status_code for _ in range(2)] == [200, 200]
+    response = client.get('/api/cache/stats', headers=alice)
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '2'
+    assert client.get('/api/cache/stats', headers=bob).status_code == 200
+    assert 'admission_shed_total{reason="rate_limited",route="read"}' in client.get('/metrics').data.decode()
+
+
+def test_busy_writes_are_shed_without_blocking_reads():
+    app = admission_app(ADMISSION_WRITE_CONCURRENCY=1, ADMISSION_WRITE_QUEUE=1, ADMISSION_QUEUE_TIMEOUT=0.05)
+    client = app.test_client()
+    with app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='service')}"}
+    writes = app.extensions['admission'].limiters['write']
+    writes.acquire()  # a long-running write holds the only slot
+
+    try:
+        response = client.post('/api/employees', headers=headers,
+                               json={'name': 'Queued Writer', 'email': 'queued@example.com'})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert client.get('/api/employees', headers=headers).status_code == 200
+
+        body = client.get('/metrics').data.decode()
+        assert 'admission_shed_total{reason="queue_timeout",route="write"}' in body
+        assert 'admission_in_flight{route="write"} 1' in body
+        assert 'admission_queue_depth{route="write"} 0' in body
+    finally:
+        writes.release()
+
+    response = client.post('/api/employees', headers=headers,
+                           json={'name': 'Queued Writer', 'email': 'queued@example.com'})
+    assert response.status_code == 201
@@ -1,31 +1,73 @@
 import sqlalchemy.exc
-from app import app_instance
-from models import Employee, db
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required
-from flask import request, jsonify, Response
+import bulk
+import cache
+import changes
+import etags
+import export
+import idempotency
+import math
+import metrics
+import migrations
+import pagination
+import search
+import serializers
+from models import Employee, EmployeeGroupCount, db
+from auth import jwt_required
+from flask_jwt_extended import create_access_token, get_jwt_identity
+from flask import Blueprint, current_app, request, jsonify, Response, stream_with_context
+from datetime import datetime
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm.exc import StaleDataError
 from werkzeug.exceptions import NotFound
+from werkzeug.local import LocalProxy
 from typing import Dict, Any, Optional
 
-jwt = JWTManager(app_instance)
+api = Blueprint('api', __name__)
+# Per-application stores, created by ``app.create_app``
+employee_cache: cache.CacheBackend = LocalProxy(lambda: current_app.extensions['employee_cache'])
+idempotency_store: idempotency.IdempotencyStore = LocalProxy(lambda: current_app.extensions['idempotency_store'])
+metrics.CACHE.collectors.append(lambda: [({'stat': key}, value) for key, value in employee_cache.stats().items()])
 
-# Create the database and tables
-with app_instance.app_context():
-    db.create_all()
-
-@app_instance.route('/login', methods=['POST'])
+@api.route('/login', methods=['POST'])
 def login() -> tuple[Response, int]:
     username: str = request.json.get('username')
     password: str = request.json.get('password')
 
-    if username != app_instance.config['USERNAME'] or password != app_instance.config['PASSWORD']:
+    if username != current_app.config['USERNAME'] or password != current_app.config['PASSWORD']:
         return jsonify({'message': 'Invalid username or password'}), 401
 
     access_token: str = create_access_token(identity=username)
     return jsonify(access_token=access_token), 200
 
-@app_instance.route('/api/employees', methods=['POST'])
+@api.route('/api/employees', methods=['POST'])
 @jwt_required()
 def create_employee() -> tuple[Response, int]:
+    key: Optional[str] = request.headers.get('Idempotency-Key')
+    if key is None:
+        return upsert_employee() if request.args.get('upsert') == 'email' else insert_employee()
+
+    # Keys are scoped to the caller so clients cannot replay each other's results
+    scope = (get_jwt_identity(), key)
+    request_fingerprint: str = idempotency.fingerprint(request)
+    try:
+        replay: Optional[Response] = idempotency_store.begin(scope, request_fingerprint)
+    except idempotency.KeyReused:
+        return jsonify({'message': 'Idempotency-Key was already used with a different request.'}), 422
+    except idempotency.InProgress:
+        return jsonify({'message': 'A request with this Idempotency-Key is still in progress.'}), 409
+    if replay is not None:
+        return replay, replay.status_code
+
+    try:
+        response, status = upsert_employee() if request.args.get('upsert') == 'email' else insert_employee()
+    except BaseException:
+        idempotency_store.release(scope)
+        raise
+    idempotency_store.complete(scope, request_fingerprint, response, status)
+    return response, status
+
+def insert_employee() -> tuple[Response, int]:
     data: Dict[str, Any] = request.get_json()
 
     try:
@@ -44,68 +86,378 @@ def create_employee() -> tuple[Response, int]:
         db.session.rollback()
         return jsonify({'message': str(e)}), 400
 
+    employee_cache.delete(new_employee.id)
     return jsonify({'message': 'Employee created successfully!'}), 201
 
-@app_instance.route('/api/employees', methods=['GET'])
+def upsert_employee() -> tuple[Response, int]:
+    """Create the employee, or update the one with the same email, in one statement.
+
+    Rows whose values are unchanged are left alone (no version bump, no
+    change feed entry); only then is the id read back separately.
+    """
+    try:
+        values: Dict[str, Any] = bulk.validate_row(request.get_json(silent=True))
+    except bulk.RowError as e:
+        return jsonify({'message': str(e)}), 400
+
+    stmt = sqlite_insert(Employee.__table__).values(**values)
+    changed = [getattr(Employee.__table__.c, field).is_not(getattr(stmt.excluded, field))
+               for field in ('name', 'department', 'role')]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Employee.email],
+        set_={'name': stmt.excluded.name, 'department': stmt.excluded.department, 'role': stmt.excluded.role,
+              'version': Employee.version + 1, 'updated_at': datetime.utcnow()},
+        where=or_(*changed)
+    ).returning(Employee.id, Employee.version)
+    try:
+        row = db.session.execute(stmt).first()
+        db.session.commit()
+    except sqlalchemy.exc.IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': "Employee should have a unique name and email."}), 400
+
+    if row is None:
+        employee_id: int = db.session.scalar(select(Employee.id).where(Employee.email == values['email']))
+        return jsonify({'message': 'Employee unchanged.', 'id': employee_id}), 200
+    employee_cache.delete(row.id)
+    if row.version == 1:
+        return jsonify({'message': 'Employee created successfully!', 'id': row.id}), 201
+    return jsonify({'message': 'Employee updated successfully!', 'id': row.id}), 200
+
+@api.route('/api/employees/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_employees() -> tuple[Response, int]:
+    chunk_size: int = request.args.get('chunk_size', current_app.config['BULK_CHUNK_SIZE'], type=int)
+    if chunk_size < 1:
+        return jsonify({'message': 'chunk_size must be a positive integer.'}), 400
+
+    if request.mimetype == 'application/x-ndjson':
+        rows = bulk.parse_ndjson(request.stream)
+    else:
+        rows = request.get_json(silent=True)
+        if not isinstance(rows, list):
+            return jsonify({'message': 'Request body must be a JSON array or NDJSON stream of employees.'}), 400
+
+    report: Dict[str, Any] = bulk.ingest(rows, chunk_size)
+    for result in report['results']:
+        if result['status'] == 'created':
+            employee_cache.delete(result['id'])
+    return jsonify(report), 201 if report['failed'] == 0 else 207
+
+def parse_ids(ids: Any, limit: int) -> list[int]:
+    """Validate a list of ids (or their strings); raises ``bulk.RowError``."""
+    try:
+        ids = [int(employee_id) for employee_id in ids]
+    except (TypeError, ValueError):
+        raise bulk.RowError('ids must be a list of integers.')
+    if not ids or len(ids) > limit:
+        raise bulk.RowError(f'ids must hold between 1 and {limit} ids.')
+    return ids
+
+def bulk_filters(ids: Any = None) -> list:
+    """Filters of a set-based PATCH/DELETE from ?department=, ?role= and ?ids=.
+
+    Raises ``bulk.RowError`` when the ids are malformed or nothing narrows
+    the statement down, so a missing filter never touches every employee.
+    """
+    filters = []
+    for field in ('department', 'role'):
+        value: Optional[str] = request.args.get(field)
+        if value:
+            filters.append(getattr(Employee, field) == value)
+
+    if ids is None and 'ids' in request.args:
+        ids = request.args['ids'].split(',')
+    if ids is not None:
+        filters.append(Employee.id.in_(parse_ids(ids, current_app.config['MAX_BULK_IDS'])))
+
+    if not filters:
+        raise bulk.RowError('At least one of department, role or ids is required.')
+    return filters
+
+@api.route('/api/employees', methods=['PATCH'])
+@jwt_required()
+def bulk_update_employees() -> tuple[Response, int]:
+    try:
+        filters = bulk_filters()
+        changes = bulk.validate_changes(request.get_json(silent=True))
+    except bulk.RowError as e:
+        return jsonify({'message': str(e)}), 400
+
+    ids = bulk.update_where(filters, changes)
+    for employee_id in ids:
+        employee_cache.delete(employee_id)
+    return jsonify({'updated': len(ids)}), 200
+
+@api.route('/api/employees', methods=['DELETE'])
+@jwt_required()
+def bulk_delete_employees() -> tuple[Response, int]:
+    body = request.get_json(silent=True)
+    try:
+        filters = bulk_filters(body.get('ids') if isinstance(body, dict) else None)
+    except bulk.RowError as e:
+        return jsonify({'message': str(e)}), 400
+
+    ids = bulk.delete_where(filters)
+    for employee_id in ids:
+        employee_cache.delete(employee_id)
+    return jsonify({'deleted': len(ids)}), 200
+
+@api.route('/api/employees', methods=['GET'])
 @jwt_required()
 def get_employees() -> tuple[Response, int]:
+    if 'ids' in request.args:
+        return batch_get_employees(request.args['ids'].split(','))
+
+    etag: str = etags.list_etag(request.args.items(multi=True))
+    if request.if_none_match.contains_weak(etag):
+        return etags.not_modified(etag)
+
     department: Optional[str] = request.args.get('department')
     role: Optional[str] = request.args.get('role')
-    page: int = request.args.get('page', 1, type=int)
+    page: int = max(request.args.get('page', 1, type=int), 1)
     per_page: int = 10
-    query = Employee.query
+    filters = []
     if department:
-        query = query.filter(Employee.department == department)
+        filters.append(Employee.department == department)
 
     if role:
-        query = query.filter(Employee.role == role)
-    employees = query.paginate(page=page, per_page=per_page, error_out=False)
-    response = {
-        'total': employees.total,
-        'pages': employees.pages,
-        'current_page': employees.page,
-        'employees': [{
-            'id': emp.id,
-            'name': emp.name,
-            'email': emp.email,
-            'department': emp.department,
-            'role': emp.role,
-            'joining_date': emp.date_joined.isoformat()
-        } for emp in employees.items]
+        filters.append(Employee.role == role)
+
+    if 'after' in request.args or 'limit' in request.args:
+        response, status = get_employees_after_cursor(filters)
+        if status == 200:
+            response.set_etag(etag)
+        return response, status
+
+    total: int = count_employees(filters)
+    rows = db.session.execute(
+        select(*serializers.EMPLOYEE_COLUMNS).where(*filters)
+        .limit(per_page).offset((page - 1) * per_page)
+    ).all()
+    response = jsonify({
+        'total': total,
+        'pages': math.ceil(total / per_page),
+        'current_page': page,
+        'employees': [serializers.employee_from_row(row) for row in rows]
+    })
+    response.set_etag(etag)
+    return response, 200
+
+def count_employees(filters: list) -> int:
+    return db.session.scalar(select(func.count(Employee.id)).where(*filters))
+
+def get_employees_after_cursor(filters: list) -> tuple[Response, int]:
+    """Keyset mode of ``get_employees``: seek past ``after`` instead of OFFSET/COUNT."""
+    after: Optional[str] = request.args.get('after') or None
+    sort: str = request.args.get('sort', 'id')
+    limit: int = request.args.get('limit', 10, type=int)
+    limit = max(1, min(limit, current_app.config['MAX_PAGE_SIZE']))
+    include_total: bool = request.args.get('include_total', 'false').lower() in ('1', 'true', 'yes')
+
+    try:
+        page_query = pagination.seek(select(*serializers.EMPLOYEE_COLUMNS).where(*filters), sort, after)
+    except pagination.CursorError as e:
+        return jsonify({'message': str(e)}), 400
+
+    # One extra row tells us whether another page exists without a COUNT.
+    rows = db.session.execute(page_query.limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    response: Dict[str, Any] = {
+        'limit': limit,
+        'next_cursor': pagination.encode_cursor(sort, rows[-1]) if has_more else None,
+        'employees': [serializers.employee_from_row(row) for row in rows]
     }
+    if include_total:
+        response['total'] = count_employees(filters)
     return jsonify(response), 200
 
-@app_instance.route('/api/employees/<int:id>', methods=['GET'])
+@api.route('/api/employees/batch-get', methods=['POST'])
 @jwt_required()
-def get_employee(id: int) -> tuple[Response, int]:
+def batch_get_employees_by_body() -> tuple[Response, int]:
+    body = request.get_json(silent=True)
+    return batch_get_employees(body.get('ids') if isinstance(body, dict) else None)
+
+def batch_get_employees(ids: Any) -> tuple[Response, int]:
+    """Resolve ``ids`` in input order, from the cache first and then with chunked IN queries."""
     try:
-        employee: Employee = Employee.query.get_or_404(id)
-    except NotFound:
-        return jsonify({'message': 'Employee not found'}), 404
+        ids = list(dict.fromkeys(parse_ids(ids, current_app.config['MAX_BATCH_GET_IDS'])))
+    except bulk.RowError as e:
+        return jsonify({'message': str(e)}), 400
+
+    generation: int = employee_cache.generation()
+    found: Dict[int, Dict[str, Any]] = {}
+    pending: list[int] = []
+    for employee_id in ids:
+        cached: Optional[tuple[int, Dict[str, Any]]] = employee_cache.get(employee_id)
+        if cached is None:
+            pending.append(employee_id)
+        else:
+            found[employee_id] = cached[1]
+
+    chunk_size: int = current_app.config['BATCH_GET_CHUNK_SIZE']
+    for start in range(0, len(pending), chunk_size):
+        rows = db.session.execute(
+            select(Employee.version, *serializers.EMPLOYEE_COLUMNS)
+            .where(Employee.id.in_(pending[start:start + chunk_size]))
+        ).all()
+        for row in rows:
+            cached = (row[0], serializers.employee_from_row(row[1:]))
+            employee_cache.set(row.id, cached, generation)
+            found[row.id] = cached[1]
+
     return jsonify({
-        'id': employee.id,
-        'name': employee.name,
-        'email': employee.email,
-        'department': employee.department,
-        'role': employee.role,
-        'joining_date': employee.date_joined.isoformat()
+        'employees': [found[employee_id] for employee_id in ids if employee_id in found],
+        'missing': [employee_id for employee_id in ids if employee_id not in found]
     }), 200
 
-@app_instance.route('/api/employees/<int:id>', methods=['PUT'])
+@api.route('/api/employees/changes', methods=['GET'])
+@jwt_required()
+def get_employee_changes() -> tuple[Response, int]:
+    since: str = request.args.get('since', '0')
+    if not since.isdigit():
+        return jsonify({'message': 'since must be a non-negative integer.'}), 400
+    limit: int = request.args.get('limit', 100, type=int)
+    limit = max(1, min(limit, current_app.config['MAX_PAGE_SIZE']))
+
+    changes.maybe_purge_tombstones(current_app.config['CHANGE_LOG_RETENTION'],
+                                   current_app.config['CHANGE_LOG_PURGE_INTERVAL'])
+    try:
+        entries, has_more = changes.feed(int(since), limit)
+    except changes.ChangesPurged:
+        return jsonify({'message': 'since is older than the retained change log; resync from GET /api/employees.'}), 410
+
+    return jsonify({
+        'changes': entries,
+        'next_since': entries[-1]['seq'] if entries else int(since),
+        'has_more': has_more
+    }), 200
+
+@api.route('/api/employees/search', methods=['GET'])
+@jwt_required()
+def search_employees() -> tuple[Response, int]:
+    match: Optional[str] = search.build_match(request.args.get('q', ''))
+    if match is None:
+        return jsonify({'message': 'q must contain at least one word to search for.'}), 400
+
+    etag: str = etags.list_etag(request.args.items(multi=True))
+    if request.if_none_match.contains_weak(etag):
+        return etags.not_modified(etag)
+
+    limit: int = request.args.get('limit', 10, type=int)
+    limit = max(1, min(limit, current_app.config['MAX_PAGE_SIZE']))
+    try:
+        rows, next_cursor, ranked = search.search(match, request.args.get('department'), request.args.get('role'),
+                                                  limit, request.args.get('after') or None,
+                                                  current_app.config['SEARCH_MAX_RANKED_MATCHES'])
+    except pagination.CursorError as e:
+        return jsonify({'message': str(e)}), 400
+
+    response = jsonify({
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'ranked': ranked,
+        'employees': [serializers.employee_from_row(row) for row in rows]
+    })
+    response.set_etag(etag)
+    return response, 200
+
+@api.route('/api/employees/stats', methods=['GET'])
+@jwt_required()
+def get_employee_stats() -> tuple[Response, int]:
+    etag: str = etags.list_etag(request.args.items(multi=True))
+    if request.if_none_match.contains_weak(etag):
+        return etags.not_modified(etag)
+
+    by_department: Dict[Optional[str], int] = {}
+    by_role: Dict[Optional[str], int] = {}
+    groups = []
+    for group in db.session.execute(select(EmployeeGroupCount).order_by(
+            EmployeeGroupCount.department, EmployeeGroupCount.role)).scalars():
+        department: Optional[str] = group.department or None
+        role: Optional[str] = group.role or None
+        by_department[department] = by_department.get(department, 0) + group.headcount
+        by_role[role] = by_role.get(role, 0) + group.headcount
+        groups.append({'department': department, 'role': role, 'count': group.headcount})
+
+    response = jsonify({
+        'total': sum(by_department.values()),
+        'by_department': [{'department': key, 'count': count} for key, count in by_department.items()],
+        'by_role': [{'role': key, 'count': count} for key, count in sorted(by_role.items(), key=lambda item: item[0] or '')],
+        'by_department_role': groups
+    })
+    response.set_etag(etag)
+    return response, 200
+
+@api.route('/api/employees/export', methods=['GET'])
+@jwt_required()
+def export_employees() -> Response | tuple[Response, int]:
+    export_format: str = request.args.get('format', 'ndjson')
+    if export_format not in export.FORMATTERS:
+        return jsonify({'message': "format must be one of 'ndjson' or 'csv'."}), 400
+
+    result = export.stream_rows(request.args.get('department'), request.args.get('role'),
+                                current_app.config['EXPORT_BATCH_SIZE'])
+    body = stream_with_context(export.FORMATTERS[export_format](result))
+    return Response(body, mimetype=export.CONTENT_TYPES[export_format], headers={
+        'Content-Disposition': f'attachment; filename=employees.{export_format}'
+    })
+
+@api.route('/api/employees/<int:id>', methods=['GET'])
+@jwt_required()
+def get_employee(id: int) -> tuple[Response, int]:
+    # Taken before the row is read, so a write committed meanwhile keeps it out of the cache
+    generation: int = employee_cache.generation()
+    cached: Optional[tuple[int, Dict[str, Any]]] = employee_cache.get(id)
+    if cached is None and request.if_none_match:
+        # Answer a revalidation from the version column alone
+        version: Optional[int] = db.session.scalar(select(Employee.version).where(Employee.id == id))
+        if version is not None and request.if_none_match.contains_weak(etags.employee_etag(id, version)):
+            return etags.not_modified(etags.employee_etag(id, version))
+
+    if cached is None:
+        row = db.session.execute(
+            select(Employee.version, *serializers.EMPLOYEE_COLUMNS).where(Employee.id == id)
+        ).first()
+        if row is None:
+            return jsonify({'message': 'Employee not found'}), 404
+        cached = (row[0], serializers.employee_from_row(row[1:]))
+        employee_cache.set(id, cached, generation)
+
+    version, employee_json = cached
+    etag: str = etags.employee_etag(id, version)
+    if request.if_none_match.contains_weak(etag):
+        return etags.not_modified(etag)
+    response = jsonify(employee_json)
+    response.set_etag(etag)
+    return response, 200
+
+def precondition_failed() -> tuple[Response, int]:
+    return jsonify({'message': 'Employee was modified by another request.'}), 412
+
+@api.route('/api/employees/<int:id>', methods=['PUT'])
 @jwt_required()
 def update_employee(id: int) -> tuple[Response, int]:
     data: Dict[str, Any] = request.get_json()
 
     try:
         employee: Employee = Employee.query.get_or_404(id)
+        if request.if_match and not request.if_match.contains(etags.employee_etag(id, employee.version)):
+            return precondition_failed()
         employee.name = data['name']
         employee.email = data['email']
         employee.department = data.get('department')
         employee.role = data.get('role')
+        db.session.flush()
+        version: int = employee.version
         db.session.commit()
     except NotFound:
         db.session.rollback()
         return jsonify({'message': 'Employee not found'}), 404
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
     except sqlalchemy.exc.IntegrityError:
         db.session.rollback()
         return jsonify({'message': 'Error: An employee with this email already exists.'}), 400
@@ -113,18 +465,106 @@ def update_employee(id: int) -> tuple[Response, int]:
         db.session.rollback()
         return jsonify({'message': 'An error occurred.', 'error': str(e)}), 500
 
-    return jsonify({'message': 'Employee updated successfully!'}), 200
+    employee_cache.delete(id)
+    response = jsonify({'message': 'Employee updated successfully!'})
+    response.set_etag(etags.employee_etag(id, version))
+    return response, 200
+
+PATCHABLE_FIELDS = ('name', 'email', 'department', 'role')
 
-@app_instance.route('/api/employees/<int:id>', methods=['DELETE'])
+@api.route('/api/employees/<int:id>', methods=['PATCH'])
+@jwt_required()
+def patch_employee(id: int) -> tuple[Response, int]:
+    """Apply the supplied fields in a single ``UPDATE ... RETURNING``.
+
+    The expected version comes from a ``version`` field or an ``If-Match``
+    ETag and is checked in the WHERE clause, so no row is loaded first. Only
+    when nothing was updated is the version looked up, to tell 404 from a
+    conflict: 412 for a failed ``If-Match``, like PUT and DELETE, and 409
+    for a stale ``version`` field.
+    """
+    data: Dict[str, Any] = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'message': 'Request body must be a JSON object.'}), 400
+    expected: Any = data.pop('version', None)
+    unknown = sorted(set(data) - set(PATCHABLE_FIELDS))
+    if unknown:
+        return jsonify({'message': f"Cannot update {', '.join(repr(field) for field in unknown)}."}), 400
+    if not data:
+        return jsonify({'message': f"Request body must set at least one of {', '.join(PATCHABLE_FIELDS)}."}), 400
+    for field, value in data.items():
+        required = field in ('name', 'email')
+        if not (isinstance(value, str) and value.strip()) and (required or value is not None):
+            return jsonify({'message': f"'{field}' must be a {'non-empty ' if required else ''}string."}), 400
+
+    if expected is None and request.if_match and not request.if_match.star_tag:
+        # An If-Match naming another employee or no version can never match
+        expected = etags.employee_version(request.if_match, id) or 0
+    if expected is not None and (not isinstance(expected, int) or isinstance(expected, bool)):
+        return jsonify({'message': "'version' must be an integer."}), 400
+
+    stmt = (update(Employee.__table__).where(Employee.id == id)
+            .values(**data, version=Employee.version + 1, updated_at=datetime.utcnow())
+            .returning(Employee.version, *serializers.EMPLOYEE_COLUMNS))
+    if expected is not None:
+        stmt = stmt.where(Employee.version == expected)
+    try:
+        row = db.session.execute(stmt).first()
+        db.session.commit()
+    except sqlalchemy.exc.IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': 'Error: An employee with this email already exists.'}), 400
+
+    if row is None:
+        if expected is None or db.session.scalar(select(Employee.version).where(Employee.id == id)) is None:
+            return jsonify({'message': 'Employee not found'}), 404
+        if request.if_match:
+            return precondition_failed()
+        return jsonify({'message': 'Employee was modified by another request.'}), 409
+
+    employee_cache.delete(id)
+    response = jsonify(serializers.employee_from_row(row[1:]))
+    response.set_etag(etags.employee_etag(id, row[0]))
+    return response, 200
+
+@api.route('/api/employees/<int:id>', methods=['DELETE'])
 @jwt_required()
 def delete_employee(id: int) -> tuple[Response, int]:
     try:
         employee: Employee = Employee.query.get_or_404(id)
+        if request.if_match and not request.if_match.contains(etags.employee_etag(id, employee.version)):
+            return precondition_failed()
         db.session.delete(employee)
         db.session.commit()
+        employee_cache.delete(id)
         return jsonify({'message': 'Employee deleted successfully!'}), 200
     except NotFound:
         return jsonify({'message': 'Employee Id not found.'}), 404
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
     except Exception as e:
         db.session.rollback()
-        return jsonify({'message': 'An error occurred'}), 400
\ No newline at end of file
+        return jsonify({'message': 'An error occurred'}), 400
+
+@api.route('/api/cache/stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats() -> tuple[Response, int]:
+    return jsonify(employee_cache.stats()), 200
+
+@api.route('/metrics', methods=['GET'])
+def get_metrics() -> Response:
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/readyz', methods=['GET'])
+def get_readiness() -> tuple[Response, int]:
+    """Ready once the database answers and every migration has been applied."""
+    try:
+        with db.engine.connect() as conn:
+            pending = migrations.pending(conn)
+    except sqlalchemy.exc.DBAPIError as e:
+        return jsonify({'status': 'unavailable', 'message': str(e.orig)}), 503
+    if pending:
+        return jsonify({'status': 'unavailable', 'message': 'Schema migrations are pending; run init-db.',
+                        'pending': pending}), 503
+    return jsonify({'status': 'ready'}), 200